@@ -0,0 +1,44 @@
+"""add session_scheduled_posts
+
+Revision ID: 4b1e9d2c7a60
+Revises: 
+Create Date: 2026-10-15 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e9d2c7a60'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The app's create_all may already have created the table on startup
+    if sa.inspect(op.get_bind()).has_table('session_scheduled_posts'):
+        return
+    op.create_table(
+        'session_scheduled_posts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('schedule_time', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_session_scheduled_posts_id'), 'session_scheduled_posts', ['id'], unique=False)
+    op.create_index(op.f('ix_session_scheduled_posts_session_id'), 'session_scheduled_posts', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_session_scheduled_posts_session_id'), table_name='session_scheduled_posts')
+    op.drop_index(op.f('ix_session_scheduled_posts_id'), table_name='session_scheduled_posts')
+    op.drop_table('session_scheduled_posts')
@@ -0,0 +1,43 @@
+"""add scheduled_posts job_id and post_id
+
+Revision ID: 9c3f5a1e2d84
+Revises: 4b1e9d2c7a60
+Create Date: 2026-10-15 10:31:07.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f5a1e2d84'
+down_revision: Union[str, None] = '4b1e9d2c7a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # A missing table is created with these columns by the app's create_all
+    if not inspector.has_table('scheduled_posts'):
+        return
+    columns = {column['name'] for column in inspector.get_columns('scheduled_posts')}
+    with op.batch_alter_table('scheduled_posts') as batch_op:
+        if 'post_id' not in columns:
+            batch_op.add_column(sa.Column('post_id', sa.Integer(), nullable=True))
+            batch_op.create_index(batch_op.f('ix_scheduled_posts_post_id'), ['post_id'], unique=False)
+            batch_op.create_foreign_key('fk_scheduled_posts_post_id_posts', 'posts', ['post_id'], ['id'])
+        if 'job_id' not in columns:
+            batch_op.add_column(sa.Column('job_id', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('scheduled_posts') as batch_op:
+        batch_op.drop_column('job_id')
+        batch_op.drop_constraint('fk_scheduled_posts_post_id_posts', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_scheduled_posts_post_id'))
+        batch_op.drop_column('post_id')
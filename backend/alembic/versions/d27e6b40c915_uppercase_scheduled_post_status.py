@@ -0,0 +1,36 @@
+"""uppercase scheduled_posts status
+
+Revision ID: d27e6b40c915
+Revises: 9c3f5a1e2d84
+Create Date: 2026-10-16 09:18:52.664107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27e6b40c915'
+down_revision: Union[str, None] = '9c3f5a1e2d84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table('scheduled_posts'):
+        return
+    # Rows written with the old lowercase default never match the scheduler,
+    # which uses PostStatus values
+    op.execute(
+        "UPDATE scheduled_posts SET status = UPPER(status) "
+        "WHERE status IS NOT NULL AND status <> UPPER(status)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The original casing is not recorded; uppercase statuses are left as is
+    pass
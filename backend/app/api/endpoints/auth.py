@@ -304,7 +304,8 @@ async def get_post_engagement(
 async def get_task_status(task_id: str):
     """Get the status of a task"""
     from celery.result import AsyncResult
-    task_result = AsyncResult(task_id)
+    from ...worker import celery_app
+    task_result = AsyncResult(task_id, app=celery_app)
     return {
         "task_id": task_id,
         "status": task_result.status,
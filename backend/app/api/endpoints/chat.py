@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any
 from ...services.chat import ChatService
 from ...schemas.chat import ChatRequest, ChatResponse
@@ -34,4 +35,18 @@ async def chat(request: ChatRequest) -> ChatResponse:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process chat request: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Stream chat responses as server-sent events while they are generated.
+    """
+    chat_service = ChatService()
+    return StreamingResponse(
+        chat_service.stream_response(
+            message=request.message,
+            chat_history=request.chat_history
+        ),
+        media_type="text/event-stream"
+    )
@@ -31,6 +31,8 @@ manager = ConnectionManager()
 
 async def handle_websocket(websocket: WebSocket):
     """Handle WebSocket connections for streaming chat."""
+    # Shared with the HTTP routes; created and closed by the app's lifespan
+    generator: LLMGenerator = websocket.app.state.llm_generator
     await manager.connect(websocket)
     
     try:
@@ -42,14 +44,11 @@ async def handle_websocket(websocket: WebSocket):
                 user_message = message_data.get("message", "")
                 chat_history = message_data.get("chat_history", [])
                 
-                # Initialize LLM generator
-                generator = LLMGenerator()
-                
                 # Set up accumulator for the full response
                 full_response = ""
                 
                 # Stream the response
-                async for chunk in generator.generate_posts_async(user_message, chat_history, stream=True):
+                async for chunk in generator.stream_chat_response(user_message, chat_history):
                     # Send the chunk to the client
                     await manager.send_message(websocket, chunk)
                     
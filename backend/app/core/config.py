@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PORT: int = 8000
     HOST: str = "0.0.0.0"
+    THREADPOOL_SIZE: int = 100  # anyio worker threads for sync dependencies and endpoints
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
@@ -40,6 +41,7 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./app.db"
+    DB_POOL_CONCURRENCY: int = 4  # threads/greenlets per process sharing the engine
 
     # Security
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
@@ -62,6 +64,7 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    REDIS_URL: str = "redis://localhost:6379/0"
 
     # Groq API
     GROQ_API_KEY: str = ""
@@ -76,6 +79,13 @@ class Settings(BaseSettings):
     # Timeout
     TIMEOUT: int = 30
 
+    # Response cache (only used at temperature 0 unless CACHE_RESPONSES is set)
+    CACHE_RESPONSES: bool = False
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL: int = 6 * 60 * 60
+    RESPONSE_CACHE_THRESHOLD: float = 0.92  # minimum cosine similarity for a semantic hit
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+
     # Post Generation
     MAX_POSTS_PER_REQUEST: int = 5
     MAX_SCHEDULED_POSTS: int = 10
@@ -24,12 +24,14 @@ class User(Base):
     linkedin_token_expires_at = Column(DateTime, nullable=True)
     
     # Relationships
-    posts = relationship("LinkedInPost", back_populates="user")
+    posts = relationship("Post", back_populates="user")
+    linkedin_posts = relationship("LinkedInPost", back_populates="user")
     scheduled_posts = relationship("ScheduledPost", back_populates="user")
 
 class PostStatus(enum.Enum):
     DRAFT = "DRAFT"
     SCHEDULED = "SCHEDULED"
+    DISPATCHED = "DISPATCHED"
     POSTED = "POSTED"
     FAILED = "FAILED"
     CANCELLED = "CANCELLED"
@@ -48,7 +50,7 @@ class LinkedInPost(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    user = relationship("User", back_populates="posts")
+    user = relationship("User", back_populates="linkedin_posts")
 
 class Post(Base):
     __tablename__ = "posts"
@@ -78,13 +80,27 @@ class ScheduledPost(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=True, index=True)
+    job_id = Column(String, nullable=True)  # publish_post task id, set when scheduled
     content = Column(Text)
     scheduled_time = Column(DateTime)
-    status = Column(String, default="scheduled")  # scheduled, posted, failed, cancelled
+    status = Column(String, default=PostStatus.SCHEDULED.value)  # a PostStatus value
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="scheduled_posts")
+    post = relationship("Post", back_populates="scheduled_post")
+
+class SessionScheduledPost(Base):
+    """Post scheduled from the chat UI, keyed by browser session rather than user."""
+    __tablename__ = "session_scheduled_posts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, index=True)
+    content = Column(Text)
+    schedule_time = Column(DateTime)
+    status = Column(String, default="scheduled")
+    created_at = Column(DateTime, default=datetime.now)
 
 class PostAnalytics(Base):
     __tablename__ = "post_analytics"
@@ -7,8 +7,9 @@ from ..core.config import settings
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
+    pool_size=max(4, settings.DB_POOL_CONCURRENCY),
+    max_overflow=2 * settings.DB_POOL_CONCURRENCY,
+    pool_recycle=1800
 )
 
 # Create SessionLocal class
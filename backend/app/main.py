@@ -1,6 +1,6 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from datetime import datetime
 import logging
 import time
@@ -9,6 +9,7 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.endpoints import chat_router
+from app.services import chat
 
 # Configure logging
 logging.basicConfig(
@@ -25,7 +26,8 @@ app = FastAPI(
     title="AI Chat API",
     description="API for AI-powered chat interactions",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Set up CORS
@@ -59,6 +61,10 @@ async def startup_event():
     for route in app.routes:
         logger.info(f"Route: {route.path} [{route.methods}]")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await chat.close_client()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -1,10 +1,41 @@
 import httpx
+import orjson
 import logging
-from typing import Dict, List, Optional, Any
+from typing import AsyncGenerator, Dict, List, Optional, Any
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared Groq HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=64),
+            http2=True,
+            headers={
+                "Authorization": f"Bearer {settings.GROQ_API_KEY}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the shared Groq HTTP client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _sse_frame(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """Encode a payload as a server-sent event frame."""
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"event: " + event.encode() + b"\n" + frame if event else frame
+
 class ChatService:
     def __init__(self):
         self.api_key = settings.GROQ_API_KEY
@@ -82,37 +113,33 @@ class ChatService:
             Keep the total length under 1300 characters."""
             
             # Generate the post
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.api_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_message},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": settings.TEMPERATURE,
-                        "max_tokens": settings.MAX_TOKENS,
-                        "top_p": settings.TOP_P,
-                        "frequency_penalty": settings.FREQUENCY_PENALTY,
-                        "presence_penalty": settings.PRESENCE_PENALTY
-                    }
-                )
+            client = _get_client()
+            response = await client.post(
+                f"{self.api_url}/chat/completions",
+                content=orjson.dumps({
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": settings.TEMPERATURE,
+                    "max_tokens": settings.MAX_TOKENS,
+                    "top_p": settings.TOP_P,
+                    "frequency_penalty": settings.FREQUENCY_PENALTY,
+                    "presence_penalty": settings.PRESENCE_PENALTY
+                })
+            )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    if not content:
-                        raise Exception("Empty response from Groq API")
-                    return content
-                else:
-                    error_msg = f"Failed to generate post: {response.text}"
-                    logger.error(error_msg)
-                    raise Exception(error_msg)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+                if not content:
+                    raise Exception("Empty response from Groq API")
+                return content
+            else:
+                error_msg = f"Failed to generate post: {response.text}"
+                logger.error(error_msg)
+                raise Exception(error_msg)
             
         except Exception as e:
             logger.error(f"Error generating post: {str(e)}")
@@ -133,36 +160,95 @@ class ChatService:
             messages.append({"role": "user", "content": message})
 
             # Generate response
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.api_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "temperature": settings.TEMPERATURE,
-                        "max_tokens": settings.MAX_TOKENS,
-                        "top_p": settings.TOP_P,
-                        "frequency_penalty": settings.FREQUENCY_PENALTY,
-                        "presence_penalty": settings.PRESENCE_PENALTY
-                    }
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    if not content:
-                        raise Exception("Empty response from Groq API")
-                    return content
-                else:
+            client = _get_client()
+            response = await client.post(
+                f"{self.api_url}/chat/completions",
+                content=orjson.dumps({
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": settings.TEMPERATURE,
+                    "max_tokens": settings.MAX_TOKENS,
+                    "top_p": settings.TOP_P,
+                    "frequency_penalty": settings.FREQUENCY_PENALTY,
+                    "presence_penalty": settings.PRESENCE_PENALTY
+                })
+            )
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+                if not content:
+                    raise Exception("Empty response from Groq API")
+                return content
+            else:
+                error_msg = f"Chat API error: {response.text}"
+                logger.error(error_msg)
+                return error_msg
+
+        except Exception as e:
+            error_msg = f"Error getting chat response: {str(e)}"
+            logger.error(error_msg)
+            return error_msg
+
+    async def stream_response(
+        self,
+        message: str,
+        chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream a response from the chat model as server-sent events.
+
+        Each token batch is sent as a data frame as soon as Groq produces it,
+        followed by a final "done" event carrying token usage.
+        """
+        if not self.api_key:
+            yield _sse_frame({"error": "GROQ API key is not configured"}, event="error")
+            return
+
+        messages = list(chat_history or [])
+        messages.append({"role": "user", "content": message})
+        usage = None
+
+        try:
+            client = _get_client()
+            async with client.stream(
+                "POST",
+                f"{self.api_url}/chat/completions",
+                content=orjson.dumps({
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": settings.TEMPERATURE,
+                    "max_tokens": settings.MAX_TOKENS,
+                    "top_p": settings.TOP_P,
+                    "frequency_penalty": settings.FREQUENCY_PENALTY,
+                    "presence_penalty": settings.PRESENCE_PENALTY,
+                    "stream": True
+                })
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
                     error_msg = f"Chat API error: {response.text}"
                     logger.error(error_msg)
-                    return error_msg
+                    yield _sse_frame({"error": error_msg}, event="error")
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+                    chunk = orjson.loads(data)
+                    # Groq reports usage on the final chunk
+                    usage = chunk.get("x_groq", {}).get("usage", usage)
+                    choices = chunk.get("choices")
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        yield _sse_frame({"content": content})
+
+            yield _sse_frame({"usage": usage}, event="done")
 
         except Exception as e:
-            error_msg = f"Error getting chat response: {str(e)}"
+            error_msg = f"Error streaming chat response: {str(e)}"
             logger.error(error_msg)
-            return error_msg 
\ No newline at end of file
+            yield _sse_frame({"error": error_msg}, event="error")
@@ -1,17 +1,184 @@
 import os
+import time
+import socket
 import logging
 import json
-from typing import Dict, Any, Optional
+import orjson
+from typing import Dict, Any, Optional, Tuple
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
+import anyio
 import httpx
+import httpcore
 from ..core.config import settings
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# How long a resolved LinkedIn address is reused before getaddrinfo runs again
+DNS_CACHE_TTL = 300.0
+
+class _CachingResolverBackend(httpcore.AnyIOBackend):
+    """Network backend that caches DNS lookups per (host, port).
+
+    TLS still uses the original hostname for SNI and certificate checks;
+    only the TCP connect goes to the cached address. A lookup is reused
+    for ttl seconds, and dropped as soon as a connect to it fails so the
+    next attempt resolves again.
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        super().__init__()
+        self._ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[str, float]] = {}
+
+    async def _resolve(self, host: str, port: int) -> str:
+        key = (host, port)
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            return cached[0]
+
+        infos = await anyio.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._cache[key] = (address, now + self._ttl)
+        return address
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        address = await self._resolve(host, port)
+        try:
+            return await super().connect_tcp(
+                address,
+                port,
+                timeout=timeout,
+                local_address=local_address,
+                socket_options=socket_options
+            )
+        except (httpcore.ConnectError, httpcore.ConnectTimeout):
+            self._cache.pop((host, port), None)
+            raise
+
+# httpcore raises exceptions named like httpx's; the transport re-raises
+# them as the httpx ones so callers can catch httpx.TransportError
+_HTTPCORE_ERRORS = (
+    httpcore.TimeoutException,
+    httpcore.NetworkError,
+    httpcore.ProtocolError,
+    httpcore.ProxyError,
+    httpcore.UnsupportedProtocol
+)
+
+def _httpx_error(exc: Exception) -> httpx.TransportError:
+    return getattr(httpx, type(exc).__name__, httpx.TransportError)(str(exc))
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        try:
+            async for part in self._stream:
+                yield part
+        except _HTTPCORE_ERRORS as exc:
+            raise _httpx_error(exc) from exc
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+class _LinkedInTransport(httpx.AsyncBaseTransport):
+    """HTTP transport for LinkedIn hosts with cached DNS resolution.
+
+    httpx.AsyncHTTPTransport does not take a network backend, so this
+    drives an httpcore connection pool built with one directly.
+    """
+
+    def __init__(self, http2: bool = False, limits: httpx.Limits = httpx.Limits(), retries: int = 1):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(http2=http2),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            retries=retries,
+            network_backend=_CachingResolverBackend()
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions
+        )
+        try:
+            response = await self._pool.handle_async_request(core_request)
+        except _HTTPCORE_ERRORS as exc:
+            raise _httpx_error(exc) from exc
+
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared LinkedIn HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.TIMEOUT,
+            transport=_LinkedInTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=16, max_connections=64)
+            )
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the shared LinkedIn HTTP client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _build_ugc_post(
+    author: str,
+    text: str,
+    visibility: str = "PUBLIC",
+    lifecycle_state: str = "PUBLISHED",
+    media_category: str = "NONE"
+) -> Dict[str, Any]:
+    """Build the common ugcPosts request body shared by all post methods."""
+    return {
+        "author": author,
+        "lifecycleState": lifecycle_state,
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {
+                    "text": text
+                },
+                "shareMediaCategory": media_category
+            }
+        },
+        "visibility": {
+            "com.linkedin.ugc.MemberNetworkVisibility": visibility
+        }
+    }
+
 class LinkedInService:
     """Service for interacting with LinkedIn API."""
     
@@ -52,27 +219,27 @@ class LinkedInService:
                 return False
 
             self._update_headers()
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/me",
-                    headers=self.headers
-                )
+            client = _get_client()
+            response = await client.get(
+                f"{self.api_base_url}/me",
+                headers=self.headers
+            )
                 
-                if response.status_code == 200:
-                    profile_data = response.json()
-                    self.user_id = profile_data.get("id")
-                    os.environ["LINKEDIN_USER_ID"] = self.user_id
-                    logger.info(f"Successfully verified authentication for user: {self.user_id}")
-                    return True
-                else:
-                    logger.error(f"Authentication verification failed: {response.text}")
-                    # Clear invalid tokens
-                    self.access_token = None
-                    self.refresh_token = None
-                    os.environ.pop("LINKEDIN_ACCESS_TOKEN", None)
-                    os.environ.pop("LINKEDIN_REFRESH_TOKEN", None)
-                    os.environ.pop("LINKEDIN_USER_ID", None)
-                    return False
+            if response.status_code == 200:
+                profile_data = orjson.loads(response.content)
+                self.user_id = profile_data.get("id")
+                os.environ["LINKEDIN_USER_ID"] = self.user_id
+                logger.info(f"Successfully verified authentication for user: {self.user_id}")
+                return True
+            else:
+                logger.error(f"Authentication verification failed: {response.text}")
+                # Clear invalid tokens
+                self.access_token = None
+                self.refresh_token = None
+                os.environ.pop("LINKEDIN_ACCESS_TOKEN", None)
+                os.environ.pop("LINKEDIN_REFRESH_TOKEN", None)
+                os.environ.pop("LINKEDIN_USER_ID", None)
+                return False
 
         except Exception as e:
             logger.error(f"Error verifying authentication: {str(e)}")
@@ -88,52 +255,52 @@ class LinkedInService:
                 return False
 
             logger.info("Attempting to refresh access token")
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    "https://www.linkedin.com/oauth/v2/accessToken",
-                    data={
-                        "grant_type": "refresh_token",
-                        "refresh_token": self.refresh_token,
-                        "client_id": settings.LINKEDIN_CLIENT_ID,
-                        "client_secret": settings.LINKEDIN_CLIENT_SECRET
-                    }
-                )
+            client = _get_client()
+            response = await client.post(
+                "https://www.linkedin.com/oauth/v2/accessToken",
+                data={
+                    "grant_type": "refresh_token",
+                    "refresh_token": self.refresh_token,
+                    "client_id": settings.LINKEDIN_CLIENT_ID,
+                    "client_secret": settings.LINKEDIN_CLIENT_SECRET
+                }
+            )
 
-                if response.status_code == 200:
-                    token_data = response.json()
-                    logger.info("Successfully received new access token")
+            if response.status_code == 200:
+                token_data = orjson.loads(response.content)
+                logger.info("Successfully received new access token")
                     
-                    # Update access token
-                    self.access_token = token_data["access_token"]
-                    self._update_headers()
+                # Update access token
+                self.access_token = token_data["access_token"]
+                self._update_headers()
                     
-                    # Update environment variable
-                    os.environ["LINKEDIN_ACCESS_TOKEN"] = self.access_token
+                # Update environment variable
+                os.environ["LINKEDIN_ACCESS_TOKEN"] = self.access_token
                     
-                    # If a new refresh token is provided, update it
-                    if "refresh_token" in token_data:
-                        logger.info("Received new refresh token")
-                        self.refresh_token = token_data["refresh_token"]
-                        os.environ["LINKEDIN_REFRESH_TOKEN"] = self.refresh_token
+                # If a new refresh token is provided, update it
+                if "refresh_token" in token_data:
+                    logger.info("Received new refresh token")
+                    self.refresh_token = token_data["refresh_token"]
+                    os.environ["LINKEDIN_REFRESH_TOKEN"] = self.refresh_token
                     
-                    # Verify the new token works
-                    verify_result = await self.verify_token()
-                    if verify_result["status"] == "success":
-                        logger.info("Successfully verified new token")
-                        return True
-                    else:
-                        logger.error(f"New token verification failed: {verify_result['message']}")
-                        return False
+                # Verify the new token works
+                verify_result = await self.verify_token()
+                if verify_result["status"] == "success":
+                    logger.info("Successfully verified new token")
+                    return True
                 else:
-                    error_msg = f"Failed to refresh token: {response.text}"
-                    logger.error(error_msg)
-                    # Clear invalid tokens
-                    self.access_token = None
-                    self.refresh_token = None
-                    os.environ.pop("LINKEDIN_ACCESS_TOKEN", None)
-                    os.environ.pop("LINKEDIN_REFRESH_TOKEN", None)
-                    os.environ.pop("LINKEDIN_USER_ID", None)
+                    logger.error(f"New token verification failed: {verify_result['message']}")
                     return False
+            else:
+                error_msg = f"Failed to refresh token: {response.text}"
+                logger.error(error_msg)
+                # Clear invalid tokens
+                self.access_token = None
+                self.refresh_token = None
+                os.environ.pop("LINKEDIN_ACCESS_TOKEN", None)
+                os.environ.pop("LINKEDIN_REFRESH_TOKEN", None)
+                os.environ.pop("LINKEDIN_USER_ID", None)
+                return False
 
         except Exception as e:
             logger.error(f"Error refreshing token: {str(e)}")
@@ -173,21 +340,12 @@ class LinkedInService:
             logger.info(f"Using organization URN: {org_urn}")
             
             # Prepare post data
-            post_data = {
-                "author": org_urn,
-                "lifecycleState": "PUBLISHED",
-                "specificContent": {
-                    "com.linkedin.ugc.ShareContent": {
-                        "shareCommentary": {
-                            "text": content
-                        },
-                        "shareMediaCategory": media_category
-                    }
-                },
-                "visibility": {
-                    "com.linkedin.ugc.MemberNetworkVisibility": visibility
-                }
-            }
+            post_data = _build_ugc_post(
+                author=org_urn,
+                text=content,
+                visibility=visibility,
+                media_category=media_category
+            )
             
             # Add media if provided
             if media_url and media_category != "NONE":
@@ -204,14 +362,15 @@ class LinkedInService:
             
             # Try to create post
             logger.info("Attempting to create LinkedIn post...")
-            logger.debug(f"Post data: {json.dumps(post_data, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Post data: %s", orjson.dumps(post_data).decode())
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.api_base_url}/ugcPosts",
-                    headers=self.headers,
-                    json=post_data
-                )
+            client = _get_client()
+            response = await client.post(
+                f"{self.api_base_url}/ugcPosts",
+                headers=self.headers,
+                content=orjson.dumps(post_data)
+            )
             
             # If token is expired or invalid
             if response.status_code in [401, 403]:
@@ -235,9 +394,19 @@ class LinkedInService:
                 return {
                     "success": False,
                     "error": error_msg,
-                    "status_code": response.status_code
+                    "status_code": response.status_code,
+                    # Throttling and server errors may succeed if tried later
+                    "retryable": response.status_code == 429 or response.status_code >= 500
                 }
             
+        except httpx.TransportError as e:
+            error_msg = f"Error creating LinkedIn post: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "success": False,
+                "error": error_msg,
+                "retryable": True
+            }
         except Exception as e:
             error_msg = f"Error creating LinkedIn post: {str(e)}"
             logger.error(error_msg)
@@ -256,22 +425,13 @@ class LinkedInService:
             profile = await self._get_user_profile()
             
             # Prepare post data
-            post_data = {
-                "author": f"urn:li:person:{profile['id']}",
-                "lifecycleState": "DRAFT",
-                "specificContent": {
-                    "com.linkedin.ugc.ShareContent": {
-                        "shareCommentary": {
-                            "text": content
-                        },
-                        "shareMediaCategory": "NONE"
-                    }
-                },
-                "visibility": {
-                    "com.linkedin.ugc.MemberNetworkVisibility": visibility
-                },
-                "scheduledTime": schedule_datetime.isoformat()
-            }
+            post_data = _build_ugc_post(
+                author=f"urn:li:person:{profile['id']}",
+                text=content,
+                visibility=visibility,
+                lifecycle_state="DRAFT"
+            )
+            post_data["scheduledTime"] = schedule_datetime.isoformat()
             
             # Add media if provided
             if media_urls:
@@ -288,12 +448,12 @@ class LinkedInService:
                 ]
             
             # Make API request
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.api_base_url}/ugcPosts",
-                    headers=self.headers,
-                    json=post_data
-                )
+            client = _get_client()
+            response = await client.post(
+                f"{self.api_base_url}/ugcPosts",
+                headers=self.headers,
+                content=orjson.dumps(post_data)
+            )
             
             if response.status_code != 201:
                 raise Exception(f"LinkedIn API error: {response.text}")
@@ -301,7 +461,7 @@ class LinkedInService:
             return {
                 "status": "success",
                 "message": "Post scheduled successfully",
-                "schedule_id": response.json().get("id"),
+                "schedule_id": orjson.loads(response.content).get("id"),
                 "scheduled_time": schedule_time
             }
             
@@ -315,16 +475,16 @@ class LinkedInService:
     async def _get_user_profile(self) -> Dict[str, Any]:
         """Get the current user's LinkedIn profile."""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/me",
-                    headers=self.headers
-                )
+            client = _get_client()
+            response = await client.get(
+                f"{self.api_base_url}/me",
+                headers=self.headers
+            )
             
             if response.status_code != 200:
                 raise Exception(f"LinkedIn API error: {response.text}")
             
-            return response.json()
+            return orjson.loads(response.content)
             
         except Exception as e:
             logger.error(f"Error getting LinkedIn profile: {str(e)}")
@@ -341,11 +501,11 @@ class LinkedInService:
                 }
 
             logger.info("Verifying LinkedIn token...")
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/me",
-                    headers=self.headers
-                )
+            client = _get_client()
+            response = await client.get(
+                f"{self.api_base_url}/me",
+                headers=self.headers
+            )
             
             if response.status_code != 200:
                 error_msg = f"LinkedIn API error: {response.text}"
@@ -355,7 +515,7 @@ class LinkedInService:
                     "message": error_msg
                 }
             
-            profile_data = response.json()
+            profile_data = orjson.loads(response.content)
             logger.info(f"Successfully verified token for user: {profile_data.get('id')}")
             return {
                 "status": "success",
@@ -460,21 +620,21 @@ class LinkedInService:
         Get the LinkedIn profile URN for the authenticated user.
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/me",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "X-Restli-Protocol-Version": "2.0.0"
-                    }
-                )
+            client = _get_client()
+            response = await client.get(
+                f"{self.api_base_url}/me",
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    "X-Restli-Protocol-Version": "2.0.0"
+                }
+            )
                 
-                if response.status_code == 200:
-                    profile_data = response.json()
-                    return f"urn:li:person:{profile_data.get('id')}"
-                else:
-                    logger.error(f"Failed to get profile URN: {response.text}")
-                    return None
+            if response.status_code == 200:
+                profile_data = orjson.loads(response.content)
+                return f"urn:li:person:{profile_data.get('id')}"
+            else:
+                logger.error(f"Failed to get profile URN: {response.text}")
+                return None
         except Exception as e:
             logger.error(f"Error getting profile URN: {str(e)}")
             return None
@@ -484,15 +644,15 @@ class LinkedInService:
         Validate if the LinkedIn access token is still valid.
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/me",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "X-Restli-Protocol-Version": "2.0.0"
-                    }
-                )
-                return response.status_code == 200
+            client = _get_client()
+            response = await client.get(
+                f"{self.api_base_url}/me",
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    "X-Restli-Protocol-Version": "2.0.0"
+                }
+            )
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Error validating token: {str(e)}")
             return False
@@ -508,41 +668,30 @@ class LinkedInService:
             }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # First, create a share
-                response = await client.post(
-                    f"{self.api_base_url}/ugcPosts",
-                    headers=self.headers,
-                    json={
-                        "author": f"urn:li:person:{self.user_id}",
-                        "lifecycleState": "PUBLISHED",
-                        "specificContent": {
-                            "com.linkedin.ugc.ShareContent": {
-                                "shareCommentary": {
-                                    "text": content
-                                },
-                                "shareMediaCategory": "NONE"
-                            }
-                        },
-                        "visibility": {
-                            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-                        }
-                    }
-                )
+            client = _get_client()
+            # First, create a share
+            response = await client.post(
+                f"{self.api_base_url}/ugcPosts",
+                headers=self.headers,
+                content=orjson.dumps(_build_ugc_post(
+                    author=f"urn:li:person:{self.user_id}",
+                    text=content
+                ))
+            )
 
-                if response.status_code in [200, 201]:
-                    return {
-                        "success": True,
-                        "message": "Post successfully published to LinkedIn",
-                        "post_id": response.headers.get("x-restli-id")
-                    }
-                else:
-                    error_msg = f"LinkedIn API error: {response.text}"
-                    logger.error(error_msg)
-                    return {
-                        "success": False,
-                        "error": error_msg
-                    }
+            if response.status_code in [200, 201]:
+                return {
+                    "success": True,
+                    "message": "Post successfully published to LinkedIn",
+                    "post_id": response.headers.get("x-restli-id")
+                }
+            else:
+                error_msg = f"LinkedIn API error: {response.text}"
+                logger.error(error_msg)
+                return {
+                    "success": False,
+                    "error": error_msg
+                }
 
         except Exception as e:
             error_msg = f"Error posting to LinkedIn: {str(e)}"
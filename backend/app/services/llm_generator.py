@@ -1,23 +1,108 @@
-import os
+import asyncio
+import hashlib
+import io
+import re
 import groq
-from typing import List, Dict, Tuple, Any, Optional
+from typing import List, Dict, Tuple, Any, Optional, AsyncGenerator, Callable
 import logging
 from app.core.config import settings
 from app.services.linkedin_service import LinkedInService
+from app.services.post_generator import SYSTEM_PROMPT, estimate_tokens
 from dotenv import load_dotenv
 import httpx
-import json
+import ijson
+from cachetools import TTLCache
+import orjson
 from datetime import datetime
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Blank-line separator between posts when the model ignores the JSON format
+_POST_SPLIT = re.compile(r"\n\s*\n")
+
+def _parse_posts(content: str) -> List[str]:
+    """Extract post texts from the model output, tolerating non-JSON replies."""
+    try:
+        parsed = orjson.loads(content)
+        if isinstance(parsed, dict):
+            parsed = parsed["posts"]
+        return [post["content"] if isinstance(post, dict) else post for post in parsed]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        return [post for post in (part.strip() for part in _POST_SPLIT.split(content)) if post]
+
+# Roles accepted by the chat completions API; anything else is sent as "user"
+_VALID_ROLES = frozenset({"system", "user", "assistant"})
+
+# Attempts made when Groq rate-limits a chat request
+_RATE_LIMIT_RETRIES = 3
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a 429, preferring the Retry-After header."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return float((attempt + 1) * 2)
+
+def _validate_messages(chat_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Normalize message roles and keep only the fields the API accepts."""
+    return [
+        {
+            "role": role if (role := msg.get("role", "").lower()) in _VALID_ROLES else "user",
+            "content": msg.get("content", "")
+        }
+        for msg in chat_history
+    ]
+
+# Histories at least this long are formatted through a StringIO buffer
+_LONG_HISTORY = 32
+
+def _format_history(chat_history: List[Dict[str, str]]) -> str:
+    """Render chat history as "role: content" lines."""
+    if len(chat_history) < _LONG_HISTORY:
+        return "\n".join(f"{m['role']}: {m['content']}" for m in chat_history)
+
+    buf = io.StringIO()
+    write = buf.write
+    for i, m in enumerate(chat_history):
+        if i:
+            write("\n")
+        write(m["role"])
+        write(": ")
+        write(m["content"])
+    return buf.getvalue()
+
 class LLMGenerator:
     def __init__(self):
         """Initialize the LLM generator with configuration."""
         self.client = groq.Groq(api_key=settings.GROQ_API_KEY)
         self.linkedin_service = LinkedInService()
+        headers = {
+            "Authorization": f"Bearer {settings.GROQ_API_KEY}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        self._client = httpx.AsyncClient(timeout=settings.TIMEOUT, limits=limits, headers=headers, http2=True)
+        # Identical chat requests in flight share one upstream call, and exact
+        # repeats within a short window are answered without calling Groq.
+        # Like the app's response caches, sampled output is only reused at
+        # temperature 0 or when CACHE_RESPONSES is set.
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._chat_cache: Optional[TTLCache] = None
+        if settings.TEMPERATURE == 0 or settings.CACHE_RESPONSES:
+            self._chat_cache = TTLCache(maxsize=512, ttl=30)
+
+    async def close(self):
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
     async def generate_chat_response(self, chat_history: List[Dict[str, str]]) -> str:
         """Generate a chat response using the LLM."""
@@ -25,31 +110,135 @@ class LLMGenerator:
             if not settings.GROQ_API_KEY:
                 raise ValueError("GROQ_API_KEY is not set")
 
-            async with httpx.AsyncClient(timeout=settings.TIMEOUT) as client:
-                response = await client.post(
-                    f"{settings.GROQ_API_BASE}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": settings.GROQ_MODEL,
-                        "messages": chat_history,
-                        "temperature": settings.TEMPERATURE,
-                        "max_tokens": settings.MAX_TOKENS,
-                        "top_p": settings.TOP_P,
-                        "frequency_penalty": settings.FREQUENCY_PENALTY,
-                        "presence_penalty": settings.PRESENCE_PENALTY
-                    }
-                )
-                response.raise_for_status()
-                return response.json()["choices"][0]["message"]["content"]
+            body = orjson.dumps({
+                "model": settings.GROQ_MODEL,
+                "messages": _validate_messages(chat_history),
+                "temperature": settings.TEMPERATURE,
+                "max_tokens": settings.MAX_TOKENS,
+                "top_p": settings.TOP_P,
+                "frequency_penalty": settings.FREQUENCY_PENALTY,
+                "presence_penalty": settings.PRESENCE_PENALTY
+            })
+            key = hashlib.blake2b(body, digest_size=16).hexdigest()
+            if self._chat_cache is not None:
+                cached = self._chat_cache.get(key)
+                if cached is not None:
+                    return cached
+
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._request_chat_response(body))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shield so one caller being cancelled does not cancel the others
+            content = await asyncio.shield(task)
+            if self._chat_cache is not None:
+                self._chat_cache[key] = content
+            return content
 
         except Exception as e:
             logger.error(f"Error generating chat response: {str(e)}")
             raise
 
-    def generate_posts(self, topic: str, chat_history: Optional[List[Dict[str, str]]] = None) -> Tuple[List[str], bool]:
+    async def _request_chat_response(self, body: bytes) -> str:
+        """Send a serialized chat completion request and return the reply text."""
+        for attempt in range(_RATE_LIMIT_RETRIES):
+            response = await self._client.post(
+                f"{settings.GROQ_API_BASE}/chat/completions",
+                content=body
+            )
+            if response.status_code != 429 or attempt == _RATE_LIMIT_RETRIES - 1:
+                break
+            # Rate limited: wait without blocking other requests on the loop
+            wait_time = _retry_after(response, attempt)
+            logger.warning(f"Groq rate limit hit, retrying in {wait_time}s")
+            await asyncio.sleep(wait_time)
+        response.raise_for_status()
+        # Only the reply text is needed; skip building usage/metadata objects
+        return next(ijson.items(response.content, "choices.item.message.content"), "")
+
+    async def stream_chat_response(
+        self,
+        message: str,
+        chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a chat response for the message as it is generated."""
+        if not settings.GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY is not set")
+
+        messages = _validate_messages(chat_history or [])
+        messages.append({"role": "user", "content": message})
+        async for chunk in self._generate_streaming(messages):
+            yield chunk
+
+    async def astream_chat_response(
+        self,
+        chat_history: List[Dict[str, str]],
+        on_complete: Optional[Callable[[str], None]] = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream a chat response as server-sent event frames.
+
+        Each content delta is sent as a data frame, followed by a final
+        "done" event, or an "error" event if generation fails. on_complete,
+        if given, receives the full reply text once streaming has finished.
+        """
+        parts: List[str] = []
+        try:
+            if not settings.GROQ_API_KEY:
+                raise ValueError("GROQ_API_KEY is not set")
+            async for chunk in self._generate_streaming(_validate_messages(chat_history)):
+                parts.append(chunk["content"])
+                yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}")
+            yield b"event: error\ndata: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+            return
+        yield b"event: done\ndata: {}\n\n"
+        if on_complete is not None:
+            on_complete("".join(parts))
+
+    async def _generate_streaming(self, messages: List[Dict[str, str]]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield content deltas from a streamed Groq chat completion."""
+        async with self._client.stream(
+            "POST",
+            f"{settings.GROQ_API_BASE}/chat/completions",
+            content=orjson.dumps({
+                "model": settings.GROQ_MODEL,
+                "messages": messages,
+                "temperature": settings.TEMPERATURE,
+                "max_tokens": settings.MAX_TOKENS,
+                "top_p": settings.TOP_P,
+                "frequency_penalty": settings.FREQUENCY_PENALTY,
+                "presence_penalty": settings.PRESENCE_PENALTY,
+                "stream": True
+            })
+        ) as response:
+            response.raise_for_status()
+            # Hoist per-chunk lookups out of the loop
+            model = settings.GROQ_MODEL
+            now = datetime.now
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = line[6:] if line.startswith("data: ") else None
+                if data is None:
+                    continue
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = orjson.loads(data)
+                except ValueError:
+                    continue
+                content = chunk["choices"][0].get("delta", {}).get("content")
+                if content:
+                    yield {
+                        "type": "chunk",
+                        "content": content,
+                        "model": model,
+                        "timestamp": now().isoformat()
+                    }
+
+    async def generate_posts(self, topic: str, chat_history: Optional[List[Dict[str, str]]] = None) -> Tuple[List[str], bool]:
         """Generate LinkedIn posts based on the topic and chat history."""
         try:
             if not settings.GROQ_API_KEY:
@@ -63,41 +252,36 @@ class LLMGenerator:
 
             # Add chat history context if available
             if chat_history:
-                context = "\n".join([f"{msg['role']}: {msg['content']}" for msg in chat_history])
+                context = _format_history(chat_history)
                 prompt = f"{context}\n\n{prompt}"
 
             # Make the API request
-            with httpx.Client(timeout=settings.TIMEOUT) as client:
-                response = client.post(
-                    f"{settings.GROQ_API_BASE}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": settings.GROQ_MODEL,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": settings.TEMPERATURE,
-                        "max_tokens": settings.MAX_TOKENS,
-                        "top_p": settings.TOP_P,
-                        "frequency_penalty": settings.FREQUENCY_PENALTY,
-                        "presence_penalty": settings.PRESENCE_PENALTY
-                    }
-                )
-                response.raise_for_status()
+            response = await self._client.post(
+                f"{settings.GROQ_API_BASE}/chat/completions",
+                content=orjson.dumps({
+                    "model": settings.GROQ_MODEL,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": settings.TEMPERATURE,
+                    "max_tokens": estimate_tokens(topic, settings.MAX_POSTS_PER_REQUEST),
+                    "top_p": settings.TOP_P,
+                    "frequency_penalty": settings.FREQUENCY_PENALTY,
+                    "presence_penalty": settings.PRESENCE_PENALTY
+                })
+            )
+            response.raise_for_status()
                 
-                # Parse the response
-                content = response.json()["choices"][0]["message"]["content"]
-                posts = json.loads(content)
+            # Parse the response
+            content = orjson.loads(response.content)["choices"][0]["message"]["content"]
+            posts = _parse_posts(content)
                 
-                # Validate the response
-                if not isinstance(posts, list) or len(posts) == 0:
-                    raise ValueError("Invalid response format from LLM")
+            # Validate the response
+            if not isinstance(posts, list) or len(posts) == 0:
+                raise ValueError("Invalid response format from LLM")
                 
-                # Limit the number of posts
-                posts = posts[:settings.MAX_POSTS_PER_REQUEST]
+            # Limit the number of posts
+            posts = posts[:settings.MAX_POSTS_PER_REQUEST]
                 
-                return posts, True
+            return posts, True
 
         except Exception as e:
             logger.error(f"Error generating posts: {str(e)}")
@@ -122,23 +306,18 @@ class LLMGenerator:
                 "recommendations": List[str]
             }}"""
 
-            async with httpx.AsyncClient(timeout=settings.TIMEOUT) as client:
-                response = await client.post(
-                    f"{settings.GROQ_API_BASE}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": settings.GROQ_MODEL,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": settings.TEMPERATURE,
-                        "max_tokens": settings.MAX_TOKENS,
-                        "top_p": settings.TOP_P
-                    }
-                )
-                response.raise_for_status()
-                return json.loads(response.json()["choices"][0]["message"]["content"])
+            response = await self._client.post(
+                f"{settings.GROQ_API_BASE}/chat/completions",
+                content=orjson.dumps({
+                    "model": settings.GROQ_MODEL,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": settings.TEMPERATURE,
+                    "max_tokens": settings.MAX_TOKENS,
+                    "top_p": settings.TOP_P
+                })
+            )
+            response.raise_for_status()
+            return orjson.loads(orjson.loads(response.content)["choices"][0]["message"]["content"])
 
         except Exception as e:
             logger.error(f"Error analyzing post engagement: {str(e)}")
@@ -147,25 +326,21 @@ class LLMGenerator:
     async def generate_linkedin_post(self, topic: str, chat_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
         """Generate a LinkedIn post using the LLM."""
         try:
-            system_prompt = """You are a professional LinkedIn content creator. 
-            Create engaging, professional posts that provide value to the reader.
-            Focus on being authentic, informative, and engaging.
-            Use appropriate LinkedIn formatting (emojis, line breaks, etc.).
-            Keep the tone professional but conversational."""
-            
             messages = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": f"Create a LinkedIn post about: {topic}"}
             ]
             
             if chat_history:
                 messages.extend(chat_history)
             
-            response = self.client.chat.completions.create(
+            # The groq SDK client is synchronous; keep it off the event loop
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=settings.GROQ_MODEL,
                 messages=messages,
                 temperature=settings.TEMPERATURE,
-                max_tokens=settings.MAX_TOKENS,
+                max_tokens=estimate_tokens(topic),
                 top_p=settings.TOP_P,
                 stream=False
             )
@@ -1,12 +1,59 @@
+import asyncio
 import logging
-import json
+import orjson
 from typing import List, Dict, Any, Tuple, Optional
 import httpx
+import ijson
 from ..core.config import settings
 from ..services.linkedin_service import LinkedInService
 
 logger = logging.getLogger(__name__)
 
+_client: Optional[httpx.AsyncClient] = None
+
+# Upper bound on concurrent Groq requests per worker, however many posts are asked for
+MAX_CONCURRENT_REQUESTS = 8
+_request_slots: Optional[asyncio.Semaphore] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared Groq HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+            http2=True,
+            headers={
+                "Authorization": f"Bearer {settings.GROQ_API_KEY}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+        )
+    return _client
+
+def _get_request_slots() -> asyncio.Semaphore:
+    """Return the Groq request semaphore, created on first use inside the running loop."""
+    global _request_slots
+    if _request_slots is None:
+        _request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _request_slots
+
+async def close_client() -> None:
+    """Close the shared Groq HTTP client."""
+    global _client, _request_slots
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    # Bound to the closing loop along with the client
+    _request_slots = None
+
+# Kept short and byte-identical across requests so Groq can reuse the prefix
+SYSTEM_PROMPT = "You are a professional LinkedIn content creator writing engaging, well-structured posts with relevant hashtags."
+
+def estimate_tokens(topic: str, num_posts: int = 1) -> int:
+    """Return a max_tokens budget sized to the number of posts requested."""
+    return min(settings.MAX_TOKENS, 400 * num_posts + len(topic) // 3)
+
 def validate_payload(payload: Dict[str, Any]) -> None:
     """Validate the request payload."""
     required_fields = ["model", "messages"]
@@ -23,6 +70,47 @@ def validate_payload(payload: Dict[str, Any]) -> None:
         if "role" not in message or "content" not in message:
             raise ValueError("Each message must have 'role' and 'content' fields")
 
+async def _generate_one(topic: str) -> str:
+    """Generate a single LinkedIn post about the topic and return its text."""
+    # Prepare the request payload
+    payload = {
+        "model": settings.GROQ_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": f"Generate one LinkedIn post about {topic}. The post should be professional, engaging, and provide value to the reader. Format it with proper spacing and emojis where appropriate. Include relevant hashtags and make it suitable for LinkedIn's professional audience. Return only the post text."
+            }
+        ],
+        "temperature": settings.TEMPERATURE,
+        "max_tokens": estimate_tokens(topic),
+        "top_p": settings.TOP_P,
+        "frequency_penalty": settings.FREQUENCY_PENALTY,
+        "presence_penalty": settings.PRESENCE_PENALTY
+    }
+
+    # Validate payload before sending
+    validate_payload(payload)
+
+    # Log the request; only serialize when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sending request to Groq API with payload: %s", orjson.dumps(payload).decode())
+
+    # Make the API request
+    client = _get_client()
+    async with _get_request_slots():
+        response = await client.post(
+            f"{settings.GROQ_API_BASE}/chat/completions",
+            content=orjson.dumps(payload)
+        )
+    response.raise_for_status()
+
+    # Only the post text is needed; skip building usage/metadata objects
+    return next(ijson.items(response.content, "choices.item.message.content"), "")
+
 async def generate_posts(
     topic: str,
     num_posts: int = 1,
@@ -53,98 +141,45 @@ async def generate_posts(
     if not user_access_token:
         raise ValueError("LinkedIn access token is required for posting")
 
-    posts = []
     try:
-        # Prepare the request payload
-        payload = {
-            "model": settings.GROQ_MODEL,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a professional LinkedIn content creator. Create engaging, professional posts that provide value to the reader. Each post should be well-structured, include relevant hashtags, and be optimized for LinkedIn's algorithm."
-                },
-                {
-                    "role": "user",
-                    "content": f"Generate {num_posts} LinkedIn post{'s' if num_posts > 1 else ''} about {topic}. Each post should be professional, engaging, and provide value to the reader. Format each post with proper spacing and emojis where appropriate. Include relevant hashtags and make it suitable for LinkedIn's professional audience."
-                }
-            ],
-            "temperature": settings.TEMPERATURE,
-            "max_tokens": settings.MAX_TOKENS,
-            "top_p": settings.TOP_P,
-            "frequency_penalty": settings.FREQUENCY_PENALTY,
-            "presence_penalty": settings.PRESENCE_PENALTY
-        }
-
-        # Validate payload before sending
-        validate_payload(payload)
-
-        # Log the request payload (excluding sensitive data)
-        safe_payload = payload.copy()
-        logger.info("Sending request to Groq API with payload: %s", json.dumps(safe_payload, indent=2))
-
-        headers = {
-            "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        # Log headers (excluding API key)
-        safe_headers = headers.copy()
-        safe_headers["Authorization"] = "Bearer [REDACTED]"
-        logger.info("Request headers: %s", json.dumps(safe_headers, indent=2))
-
-        # Make the API request
-        async with httpx.AsyncClient(timeout=settings.TIMEOUT) as client:
-            response = await client.post(
-                f"{settings.GROQ_API_BASE}/chat/completions",
-                headers=headers,
-                json=payload
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Groq API error: {response.text}")
-                return [], False
-
-            response_data = response.json()
-            generated_text = response_data["choices"][0]["message"]["content"]
-            
-            # Parse the generated text into posts
-            try:
-                # Try to parse as JSON first
-                posts_data = json.loads(generated_text)
-                if isinstance(posts_data, dict) and "posts" in posts_data:
-                    posts = [post["content"] for post in posts_data["posts"]]
-                else:
-                    # If not in expected format, split by newlines
-                    posts = [p.strip() for p in generated_text.split("\n\n") if p.strip()]
-            except json.JSONDecodeError:
-                # If not valid JSON, split by newlines
-                posts = [p.strip() for p in generated_text.split("\n\n") if p.strip()]
-
-            # Post to LinkedIn
-            if posts:
-                linkedin_service = LinkedInService()
-                
-                # Validate the access token
-                is_valid = await linkedin_service.validate_token(user_access_token)
-                if not is_valid:
-                    logger.error("Invalid LinkedIn access token")
-                    return posts, False
-                
-                # Post the first generated post
-                result = await linkedin_service.create_post(
-                    access_token=user_access_token,
-                    content=posts[0],
-                    visibility="PUBLIC"
-                )
-                
-                if not result["success"]:
-                    logger.error(f"Failed to post to LinkedIn: {result.get('error')}")
-                    return posts, False
-                
-                logger.info("Successfully posted to LinkedIn")
-                return posts, True
-
-            return posts, True
+        # One request per post so the generations run concurrently
+        results = await asyncio.gather(
+            *[_generate_one(topic) for _ in range(num_posts)],
+            return_exceptions=True
+        )
+
+        posts = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Groq API error: {str(result)}")
+            elif result.strip():
+                posts.append(result.strip())
+
+        if not posts:
+            return [], False
+
+        # Post to LinkedIn
+        linkedin_service = LinkedInService()
+
+        # Validate the access token
+        is_valid = await linkedin_service.validate_token(user_access_token)
+        if not is_valid:
+            logger.error("Invalid LinkedIn access token")
+            return posts, False
+
+        # Post the first generated post
+        result = await linkedin_service.create_post(
+            access_token=user_access_token,
+            content=posts[0],
+            visibility="PUBLIC"
+        )
+
+        if not result["success"]:
+            logger.error(f"Failed to post to LinkedIn: {result.get('error')}")
+            return posts, False
+
+        logger.info("Successfully posted to LinkedIn")
+        return posts, True
 
     except Exception as e:
         logger.error(f"Error generating posts: {str(e)}")
@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def _load_encoder(name: str):
+    """Load a sentence-transformers model once per process, shared by all caches.
+
+    Returns None if the model cannot be loaded, leaving the caches exact-match only.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+    except Exception as e:
+        logger.warning(f"Embedding model {name} unavailable, semantic cache lookup disabled: {str(e)}")
+        return None
+
+class ResponseCache:
+    """LRU cache of LLM responses that can also answer near-duplicate prompts.
+
+    Exact hits are looked up by a hash of the normalized prompt and the model.
+    Entries stored with an embedding also take part in semantic lookup; the
+    embeddings are L2-normalized, so cosine similarity against every cached
+    prompt is one matrix-vector product. Entries expire after ttl seconds and
+    the least recently used are evicted beyond maxsize.
+    """
+
+    def __init__(self, model: str, embedding_model: str, maxsize: int, ttl: float, threshold: float):
+        self.model = model
+        self.embedding_model = embedding_model
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        # key -> (response, embedding or None, expiry), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[np.ndarray], float]]" = OrderedDict()
+        # Rows of _matrix belong to _index_keys; rebuilt lazily after changes
+        self._index_keys: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._index_stale = False
+
+    def key(self, prompt: str) -> str:
+        """Return the exact-match key for a prompt, ignoring case and spacing."""
+        normalized = " ".join(prompt.lower().split())
+        return hashlib.blake2b(f"{self.model}|{normalized}".encode(), digest_size=16).hexdigest()
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Return the normalized embedding for text, or None without an encoder (CPU-bound)."""
+        encoder = _load_encoder(self.embedding_model)
+        if encoder is None:
+            return None
+        return encoder.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def warm_up(self) -> None:
+        """Load the embedding model and run one encode (CPU-bound, slow)."""
+        self.embed("warm up")
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def get_similar(self, embedding: Optional[np.ndarray]) -> Optional[Any]:
+        """Return the response for the most similar cached prompt above the threshold."""
+        if embedding is None:
+            return None
+        if self._index_stale:
+            self._rebuild()
+        if self._matrix is None:
+            return None
+        similarities = self._matrix @ embedding
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+        return self.get(self._index_keys[best])
+
+    def put(self, key: str, response: Any, embedding: Optional[np.ndarray] = None) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (response, embedding, time.monotonic() + self.ttl)
+        if embedding is not None:
+            self._index_stale = True
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, embedding, _ = self._entries.pop(key)
+        if embedding is not None:
+            self._index_stale = True
+
+    def _rebuild(self) -> None:
+        self._index_keys = [key for key, entry in self._entries.items() if entry[1] is not None]
+        self._matrix = np.stack([self._entries[key][1] for key in self._index_keys]) if self._index_keys else None
+        self._index_stale = False
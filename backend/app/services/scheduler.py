@@ -1,37 +1,93 @@
-from celery import Celery
+import asyncio
+import uuid
 from datetime import datetime
-from sqlalchemy.orm import Session
+import redis
+from celery.exceptions import Retry
+from celery.utils.time import get_exponential_backoff_interval
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
 from ..db.models import Post, ScheduledPost, PostStatus
-from .linkedin_service import LinkedInService
+from .linkedin_service import LinkedInService, close_client
+from ..core.config import settings
+from ..worker import celery_app
 import logging
 
-# Configure Celery
-celery_app = Celery('linkedin_scheduler',
-                    broker='redis://localhost:6379/0',
-                    backend='redis://localhost:6379/0')
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# publish_post retry backoff, in seconds
+RETRY_BACKOFF = 60
+RETRY_BACKOFF_MAX = 1800
+
+# Maximum scheduled posts enqueued per dispatch_due_posts run
+DISPATCH_BATCH_SIZE = 200
+
+# Marks a post as published (or being published) so a redelivered or
+# duplicated publish_post task cannot post it to LinkedIn twice
+PUBLISH_GUARD_TTL = 86400
+_redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+
+def _claim_publish(post_id: int) -> bool:
+    """Return False if another publish_post run already claimed this post.
+
+    Raises redis.RedisError when the claim cannot be checked; publishing
+    without it could post a redelivered task twice.
+    """
+    return bool(_redis.set(f"post:published:{post_id}", "1", nx=True, ex=PUBLISH_GUARD_TTL))
+
+def _release_publish(post_id: int) -> None:
+    """Drop the publish claim so a retry can post again."""
+    try:
+        _redis.delete(f"post:published:{post_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Could not release publish guard for post {post_id}: {str(e)}")
+
+async def _create_linkedin_post(
+    content: str,
+    visibility: str,
+    media_category: str,
+    media_url: Optional[str]
+) -> dict:
+    """Post to LinkedIn from a worker, on an event loop owned by the caller.
+
+    The shared LinkedIn client is bound to the loop it was first used on,
+    so it is closed before asyncio.run tears this loop down.
+    """
+    try:
+        return await LinkedInService().create_post(
+            content=content,
+            visibility=visibility,
+            media_category=media_category,
+            media_url=media_url
+        )
+    finally:
+        await close_client()
+
 class PostScheduler:
     def __init__(self, db: Session):
         self.db = db
         self.linkedin_service = LinkedInService()
 
     def schedule_post(self, post_id: int, scheduled_time: datetime) -> bool:
-        """Schedule a post for later publishing"""
+        """Schedule a post for later publishing.
+
+        Only the database row is written here; dispatch_due_posts enqueues
+        publish_post once the scheduled time has passed.
+        """
         try:
             post = self.db.query(Post).filter(Post.id == post_id).first()
             if not post:
                 logger.error(f"Post {post_id} not found")
                 return False
 
-            # Create scheduled post entry
+            # Create scheduled post entry; the task id is used at dispatch time
             scheduled_post = ScheduledPost(
                 post_id=post_id,
                 scheduled_time=scheduled_time,
-                status=PostStatus.SCHEDULED
+                status=PostStatus.SCHEDULED.value,
+                job_id=str(uuid.uuid4())
             )
             self.db.add(scheduled_post)
             
@@ -41,16 +97,6 @@ class PostScheduler:
             
             self.db.commit()
             
-            # Schedule the task
-            job = publish_post.apply_async(
-                args=[post_id],
-                eta=scheduled_time
-            )
-            
-            # Update job ID
-            scheduled_post.job_id = job.id
-            self.db.commit()
-            
             logger.info(f"Post {post_id} scheduled for {scheduled_time}")
             return True
             
@@ -62,7 +108,9 @@ class PostScheduler:
     def cancel_scheduled_post(self, post_id: int) -> bool:
         """Cancel a scheduled post"""
         try:
-            scheduled_post = self.db.query(ScheduledPost).filter(
+            scheduled_post = self.db.query(ScheduledPost).options(
+                joinedload(ScheduledPost.post)
+            ).filter(
                 ScheduledPost.post_id == post_id
             ).first()
             
@@ -70,12 +118,12 @@ class PostScheduler:
                 logger.error(f"Scheduled post {post_id} not found")
                 return False
 
-            # Revoke the Celery task
-            if scheduled_post.job_id:
-                celery_app.control.revoke(scheduled_post.job_id, terminate=True)
+            if scheduled_post.status != PostStatus.SCHEDULED.value:
+                logger.error(f"Post {post_id} has already been dispatched")
+                return False
 
             # Update statuses
-            scheduled_post.status = PostStatus.CANCELLED
+            scheduled_post.status = PostStatus.CANCELLED.value
             scheduled_post.post.status = PostStatus.CANCELLED
             
             self.db.commit()
@@ -88,55 +136,152 @@ class PostScheduler:
             return False
 
 @celery_app.task
-def publish_post(post_id: int):
-    """Celery task to publish a post to LinkedIn"""
+def dispatch_due_posts() -> int:
+    """Enqueue publish_post for scheduled posts whose time has come.
+
+    Run periodically by beat, so far-future posts wait in the database
+    rather than as ETA messages held by the broker and workers.
+    """
+    from ..db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        # SKIP LOCKED lets overlapping runs split the work instead of blocking
+        due = db.query(ScheduledPost).options(
+            joinedload(ScheduledPost.post, innerjoin=True)
+        ).filter(
+            ScheduledPost.status == PostStatus.SCHEDULED.value,
+            ScheduledPost.scheduled_time <= datetime.utcnow()
+        ).order_by(ScheduledPost.scheduled_time).limit(
+            DISPATCH_BATCH_SIZE
+        ).with_for_update(skip_locked=True, of=ScheduledPost).all()
+
+        dispatched = 0
+        for scheduled_post in due:
+            post = scheduled_post.post
+            try:
+                publish_post.apply_async(
+                    args=[
+                        post.id,
+                        post.content,
+                        post.visibility,
+                        post.media_category,
+                        post.media_url
+                    ],
+                    task_id=scheduled_post.job_id
+                )
+            except Exception as e:
+                # The rest stay SCHEDULED and are picked up by the next run
+                logger.error(f"Error enqueueing post {post.id}: {str(e)}")
+                break
+            scheduled_post.status = PostStatus.DISPATCHED.value
+            dispatched += 1
+
+        # Only enqueued posts are marked; the row locks are held until here.
+        # If this commit fails they are enqueued again under the same task
+        # id, and the publish guard stops a second post to LinkedIn.
+        db.commit()
+
+        if dispatched:
+            logger.info(f"Dispatched {dispatched} scheduled posts")
+        return dispatched
+
+    except Exception as e:
+        logger.error(f"Error dispatching scheduled posts: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, max_retries=5)
+def publish_post(
+    self,
+    post_id: int,
+    content: str,
+    visibility: str,
+    media_category: str,
+    media_url: Optional[str] = None
+):
+    """Celery task to publish a post to LinkedIn.
+
+    The post fields are snapshotted into the task arguments at dispatch
+    time, so the success path only writes status updates and never reads
+    the post back.
+    """
     from ..db.session import SessionLocal
     
     db = SessionLocal()
+    claimed = False
     try:
-        post = db.query(Post).filter(Post.id == post_id).first()
-        if not post:
-            logger.error(f"Post {post_id} not found")
-            return False
+        try:
+            claimed = _claim_publish(post_id)
+        except redis.RedisError as e:
+            # Fail closed: wait for the guard rather than risk a duplicate post
+            logger.warning(f"Publish guard unavailable for post {post_id}: {str(e)}")
+            raise self.retry(
+                exc=e,
+                countdown=get_exponential_backoff_interval(
+                    RETRY_BACKOFF, self.request.retries, RETRY_BACKOFF_MAX, full_jitter=True
+                )
+            )
+        if not claimed:
+            logger.info(f"Post {post_id} already published, skipping")
+            return True
 
-        # Get LinkedIn service
-        linkedin_service = LinkedInService()
-        
-        # Attempt to post
-        success = linkedin_service.create_post(
-            user_id=post.user_id,
-            content=post.content,
-            visibility=post.visibility,
-            media_category=post.media_category,
-            media_url=post.media_url
+        # Attempt to post; LinkedIn posts as the configured organization
+        result = asyncio.run(
+            _create_linkedin_post(content, visibility, media_category, media_url)
         )
 
-        if success:
-            post.status = PostStatus.POSTED
-            post.posted_at = datetime.utcnow()
-            if post.scheduled_post:
-                post.scheduled_post.status = PostStatus.POSTED
-        else:
-            post.status = PostStatus.FAILED
-            post.error_message = "Failed to post to LinkedIn"
-            if post.retry_count < post.max_retries:
-                # Reschedule with exponential backoff
-                post.retry_count += 1
-                delay = 2 ** post.retry_count  # 2, 4, 8 minutes
-                publish_post.apply_async(
-                    args=[post_id],
-                    countdown=delay * 60
+        if result["success"]:
+            db.execute(
+                update(Post).where(Post.id == post_id).values(
+                    status=PostStatus.POSTED,
+                    posted_at=datetime.utcnow()
+                )
+            )
+            db.execute(
+                update(ScheduledPost).where(ScheduledPost.post_id == post_id).values(
+                    status=PostStatus.POSTED.value
                 )
+            )
+            db.commit()
+            return True
 
-        db.commit()
-        return success
+        error_message = result.get("error", "Failed to post to LinkedIn")
+        post = _mark_failed(db, post_id, error_message, self.request.retries)
+        _release_publish(post_id)
+        # create_post reports HTTP failures in its result rather than
+        # raising, so transient ones are retried here and the rest fail
+        if not result.get("retryable"):
+            return False
+        # Reschedule with jittered exponential backoff
+        raise self.retry(
+            exc=RuntimeError(error_message),
+            countdown=get_exponential_backoff_interval(
+                RETRY_BACKOFF, self.request.retries, RETRY_BACKOFF_MAX, full_jitter=True
+            ),
+            max_retries=post.max_retries if post else None
+        )
 
+    except Retry:
+        raise
     except Exception as e:
         logger.error(f"Error publishing post {post_id}: {str(e)}")
-        if post:
-            post.status = PostStatus.FAILED
-            post.error_message = str(e)
-            db.commit()
+        db.rollback()
+        _mark_failed(db, post_id, str(e), self.request.retries)
+        if claimed:
+            _release_publish(post_id)
         return False
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def _mark_failed(db: Session, post_id: int, error_message: str, retries: int) -> Optional[Post]:
+    """Record a failed publish attempt on the post and return it."""
+    post = db.get(Post, post_id)
+    if post:
+        post.status = PostStatus.FAILED
+        post.error_message = error_message
+        post.retry_count = retries
+        db.commit()
+    return post
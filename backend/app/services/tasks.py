@@ -1,29 +1,13 @@
-from celery import Celery
-from sqlalchemy.orm import Session
 from datetime import datetime
 import logging
 
-from ..core.config import settings
 from ..db.session import SessionLocal
 from ..db import models
-
-celery = Celery(
-    'linkedin_agent',
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
-)
-
-celery.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
-    timezone='UTC',
-    enable_utc=True,
-)
+from ..worker import celery_app
 
 logger = logging.getLogger(__name__)
 
-@celery.task
+@celery_app.task
 def generate_linkedin_post(topic: str, user_id: int) -> dict:
     """Generate a LinkedIn post using AI"""
     try:
@@ -47,7 +31,7 @@ def generate_linkedin_post(topic: str, user_id: int) -> dict:
         logger.error(f"Error generating post: {str(e)}")
         raise
 
-@celery.task
+@celery_app.task
 def post_to_linkedin(content: str, user_id: int) -> dict:
     """Post content to LinkedIn"""
     try:
@@ -69,7 +53,8 @@ def post_to_linkedin(content: str, user_id: int) -> dict:
         logger.error(f"Error posting to LinkedIn: {str(e)}")
         raise
 
-@celery.task
+# msgpack can't encode the datetime argument; kombu's JSON serializer can
+@celery_app.task(serializer='json')
 def schedule_linkedin_post(content: str, user_id: int, scheduled_time: datetime) -> dict:
     """Schedule a post for later"""
     try:
@@ -91,7 +76,7 @@ def schedule_linkedin_post(content: str, user_id: int, scheduled_time: datetime)
         logger.error(f"Error scheduling post: {str(e)}")
         raise
 
-@celery.task
+@celery_app.task
 def analyze_linkedin_engagement(post_id: int) -> dict:
     """Analyze engagement metrics for a post"""
     try:
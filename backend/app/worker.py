@@ -1,27 +1,22 @@
 import os
 import sys
 from celery import Celery
+from celery.signals import worker_process_init
 
-# Add the project root to Python path
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, project_root)
+# Add the backend root to Python path so celery_config and app.* resolve
+backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_root)
 
-from backend.app.core.config import settings
+# The single Celery app shared by the API, the scheduler and the workers
+celery_app = Celery("linkedin_agent")
+celery_app.config_from_object("celery_config")
 
-celery_app = Celery(
-    "linkedin_agent",
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
-)
+# Import task modules so their tasks register on celery_app
+from app.services import scheduler, tasks  # noqa: E402,F401
 
-# Optional configuration
-celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
-    timezone='UTC',
-    enable_utc=True,
-)
 
-# Import tasks
-from backend.app.services.tasks import *  # noqa 
\ No newline at end of file
+@worker_process_init.connect
+def _reset_db_pool(**kwargs):
+    """Drop pooled DB connections inherited from the parent after fork."""
+    from app.db.session import engine
+    engine.dispose(close=False)
@@ -3,6 +3,10 @@ from app.core.config import settings
 
 # Celery Beat Schedule
 beat_schedule = {
+    'dispatch-due-posts': {
+        'task': 'app.services.scheduler.dispatch_due_posts',
+        'schedule': 30.0,  # Run every 30 seconds
+    },
     'cleanup-expired-tokens': {
         'task': 'app.services.tasks.cleanup_expired_tokens',
         'schedule': crontab(minute=0, hour='*/1'),  # Run every hour
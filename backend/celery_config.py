@@ -5,19 +5,40 @@ broker_url = settings.CELERY_BROKER_URL
 result_backend = settings.CELERY_RESULT_BACKEND
 
 # Task settings
-task_serializer = 'json'
-result_serializer = 'json'
-accept_content = ['json']
+# msgpack is smaller and faster than JSON; json stays accepted so messages
+# from workers that haven't been upgraded yet still decode
+task_serializer = 'msgpack'
+result_serializer = 'msgpack'
+accept_content = ['msgpack', 'json']
 timezone = 'UTC'
 enable_utc = True
 
+# Acknowledge after the task finishes so a crashed worker's task is redelivered
+task_acks_late = True
+task_reject_on_worker_lost = True
+
+# Queues, split by how long tasks hold a worker slot
+task_default_queue = 'default'
+task_routes = {
+    'app.services.scheduler.publish_post': {'queue': 'linkedin_io'},
+    'app.services.tasks.post_to_linkedin': {'queue': 'linkedin_io'},
+    'app.services.tasks.generate_linkedin_post': {'queue': 'ai'},
+    '*': {'queue': 'default'},
+}
+
 # Worker settings
+# Tasks are long-running, I/O-bound calls to Groq/LinkedIn; run workers with
+# -Ofair so a reserved task never waits behind a busy child process
 worker_prefetch_multiplier = 1
 worker_max_tasks_per_child = 1000
 worker_max_memory_per_child = 200000  # 200MB
 
 # Beat settings
 beat_schedule = {
+    'dispatch-due-posts': {
+        'task': 'app.services.scheduler.dispatch_due_posts',
+        'schedule': 30.0,  # Run every 30 seconds
+    },
     'cleanup-expired-tokens': {
         'task': 'app.services.tasks.cleanup_expired_tokens',
         'schedule': 3600.0,  # Run every hour
@@ -4,22 +4,17 @@ from dotenv import load_dotenv
 from typing import List
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Library module: leave handler and level configuration to the entrypoints
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 # Load environment variables
 load_dotenv(override=True)
 
-# Debug: Print current working directory and .env file location
-logger.debug(f"Current working directory: {os.getcwd()}")
-logger.debug(f".env file exists: {os.path.exists('.env')}")
-
-# Debug: Print all environment variables
-logger.debug("Current environment variables:")
-for key, value in os.environ.items():
-    if key in ['GROQ_API_KEY', 'LINKEDIN_CLIENT_ID', 'LINKEDIN_CLIENT_SECRET']:
-        logger.debug(f"{key}: {'*' * len(value) if value else 'Not set'}")
+# Opt-in diagnostics for locating the .env file
+if os.getenv("APP_DEBUG_CONFIG"):
+    logger.debug(f"Current working directory: {os.getcwd()}")
+    logger.debug(f".env file exists: {os.path.exists('.env')}")
 
 class Config:
     # API Configuration
@@ -55,6 +50,17 @@ class Config:
     TOP_P = 0.95
     FREQUENCY_PENALTY = 0.5
     PRESENCE_PENALTY = 0.5
+
+    # Response cache (only used at temperature 0 unless CACHE_RESPONSES is set)
+    CACHE_RESPONSES = os.getenv("CACHE_RESPONSES", "false").lower() == "true"
+    RESPONSE_CACHE_SIZE = 1024
+    RESPONSE_CACHE_TTL = 3600
+
+    # Near-duplicate topic cache (same enablement rules as the response cache)
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    SEMANTIC_CACHE_SIZE = 1024
+    SEMANTIC_CACHE_TTL = 3600
+    SEMANTIC_CACHE_THRESHOLD = 0.92
     
     # Enhanced LinkedIn Post Generation Prompt
     LINKEDIN_POST_PROMPT = """You are a professional LinkedIn content creator specializing in Hinglish (English + Hindi) content.
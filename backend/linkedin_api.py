@@ -1,5 +1,11 @@
+import hashlib
 import os
+from functools import lru_cache
+import orjson
+import redis
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 import logging
 
@@ -13,6 +19,50 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# Shared session so the TLS connection to api.linkedin.com is reused across
+# the profile lookup, the post itself and subsequent calls in this process.
+# Retry only applies to idempotent methods, so a POST is never sent twice.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Author URNs are stable per token; keep them in Redis so they survive
+# worker restarts and are shared between workers
+URN_CACHE_TTL = 86400
+_redis = redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'), socket_timeout=0.5)
+
+@lru_cache(maxsize=256)
+def _get_author_urn(access_token):
+    """
+    Return the LinkedIn person id for an access token, calling /v2/me only on a cache miss
+    """
+    cache_key = f"li:urn:{hashlib.sha256(access_token.encode()).hexdigest()}"
+    try:
+        cached = _redis.get(cache_key)
+        if cached:
+            return cached.decode()
+    except redis.RedisError as e:
+        logger.warning(f"Author URN cache unavailable: {str(e)}")
+
+    profile_response = _session.get(
+        'https://api.linkedin.com/v2/me',
+        headers={
+            'Authorization': f'Bearer {access_token}',
+            'X-Restli-Protocol-Version': '2.0.0'
+        }
+    )
+    profile_response.raise_for_status()
+    author_urn = profile_response.json()['id']
+
+    try:
+        _redis.setex(cache_key, URN_CACHE_TTL, author_urn)
+    except redis.RedisError as e:
+        logger.warning(f"Could not cache author URN: {str(e)}")
+    return author_urn
+
 def post_to_linkedin(text, media_url=None):
     """
     Post content to LinkedIn using the API
@@ -26,18 +76,17 @@ def post_to_linkedin(text, media_url=None):
     headers = {
         'Authorization': f'Bearer {linkedin_access_token}',
         'Content-Type': 'application/json',
-        'X-Restli-Protocol-Version': '2.0.0'
+        'X-Restli-Protocol-Version': '2.0.0',
+        'X-RestLi-Method': 'CREATE'
     }
     
     try:
         # Get user's URN
-        profile_url = 'https://api.linkedin.com/v2/me'
-        profile_response = requests.get(profile_url, headers=headers)
-        if profile_response.status_code != 200:
-            logger.error(f"Failed to get profile: {profile_response.text}")
-            return profile_response.status_code, profile_response.json()
-        
-        author_urn = profile_response.json()['id']
+        try:
+            author_urn = _get_author_urn(linkedin_access_token)
+        except requests.HTTPError as e:
+            logger.error(f"Failed to get profile: {e.response.text}")
+            return e.response.status_code, e.response.json()
         
         # Prepare post data
         post_data = {
@@ -72,7 +121,7 @@ def post_to_linkedin(text, media_url=None):
         
         # Post to LinkedIn
         post_url = 'https://api.linkedin.com/v2/ugcPosts'
-        response = requests.post(post_url, headers=headers, json=post_data)
+        response = _session.post(post_url, headers=headers, data=orjson.dumps(post_data))
         
         if response.status_code not in (200, 201):
             logger.error(f"Failed to create post: {response.text}")
@@ -1,12 +1,17 @@
 # llm_generator.py
 import asyncio
-import os
+import hashlib
+import random
+import re
 from dotenv import load_dotenv
-from fastapi import WebSocket
 from config import Config
-from typing import List, Dict, Optional, AsyncGenerator, Any, Union
-import json
+from app.services.response_cache import ResponseCache
+from typing import List, Dict, Optional, AsyncGenerator, Any, Tuple
+import fastjsonschema
+import ijson
+import orjson
 import httpx
+from cachetools import TTLCache
 import logging
 from datetime import datetime
 
@@ -16,12 +21,94 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Retry backoff for 429/5xx and other transient errors:
+# delay = min(_MAX_DELAY, 2**attempt) + uniform(0, _JITTER)
+_MAX_DELAY = 30.0
+_JITTER = 1.0
+
+# Timeouts are usually a slow connection rather than an overloaded server
+_TIMEOUT_RETRY_DELAY = 0.1
+
+# 4xx responses that can succeed on retry; any other 4xx fails immediately
+_RETRYABLE_CLIENT_STATUS = frozenset({408, 429})
+
+def _retry_after(response: httpx.Response) -> float:
+    """Return the Retry-After header in seconds, or 0 if absent/unparseable."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
+# Shape of one generated post. The patterns encode the content rules:
+# a title of at most 8 words, at least 4 blank-line separated paragraphs
+# and 3-5 whitespace-delimited #hashtags.
+POST_SCHEMA = {
+    "type": "object",
+    "required": ["title", "content", "post", "schedule"],
+    "properties": {
+        "title": {"type": "string", "pattern": r"^\s*(\S+(\s+\S+){0,7})?\s*$"},
+        "content": {
+            "type": "string",
+            "allOf": [
+                {"pattern": r"^(?:[\s\S]*?\n\n){3}"},
+                {"pattern": r"^(?!(?:[\s\S]*?(?<!\S)#){6})(?:[\s\S]*?(?<!\S)#){3}"}
+            ]
+        },
+        "post": {"type": "boolean"},
+        "schedule": {"type": ["string", "null"]}
+    }
+}
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["posts"],
+    "properties": {
+        "posts": {"type": "array", "minItems": 4, "maxItems": 4, "items": POST_SCHEMA}
+    }
+}
+
+# Compiled once into plain Python validation code
+_validate_post_schema = fastjsonschema.compile(POST_SCHEMA)
+_validate_response_schema = fastjsonschema.compile(RESPONSE_SCHEMA)
+
+# Blank-line paragraph breaks, and whitespace-delimited tokens starting with #
+_PARA_RE = re.compile(r'\n\n+')
+_HASHTAG_RE = re.compile(r'(?<!\S)#\S*')
+
+def _tokenize_post(content: str) -> Tuple[List[str], List[str]]:
+    """Split post content into non-empty paragraphs and hashtags."""
+    paragraphs = [paragraph for paragraph in _PARA_RE.split(content) if paragraph.strip()]
+    return paragraphs, _HASHTAG_RE.findall(content)
+
 class PostValidationError(Exception):
     """Custom exception for post validation errors."""
     pass
 
+# Shared across requests; callers must not mutate it. The full post
+# instructions live here so every request starts with the same bytes
+# and Groq can serve that prefix from its prompt cache. A plain dict
+# rather than a MappingProxyType, which orjson cannot serialize.
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a professional LinkedIn content creator specializing in Hinglish content. Your task is to create engaging, professional posts according to the user's requirements.\n\n" + Config.LINKEDIN_POST_PROMPT
+}
+
 class LLMGenerator:
     """Class for handling LLM-based LinkedIn post generation."""
+
+    # Only the topic varies per request; it goes last, after chat history
+    _PROMPT_PREFIX = "Topic: "
+
+    # Request fields that are the same for every generation
+    _BASE_PAYLOAD = {
+        "model": Config.GROQ_MODEL,
+        "temperature": Config.TEMPERATURE,
+        "max_tokens": Config.MAX_TOKENS,
+        "top_p": Config.TOP_P,
+        "frequency_penalty": Config.FREQUENCY_PENALTY,
+        "presence_penalty": Config.PRESENCE_PENALTY,
+        "response_format": {"type": "json_object"}
+    }
     
     def __init__(self):
         try:
@@ -31,85 +118,137 @@ class LLMGenerator:
             self.timeout = Config.TIMEOUT
             self.max_retries = Config.MAX_RETRIES
             self.conversation_history = []
+            # In-flight generations keyed by request, shared by concurrent callers
+            self._inflight: Dict[str, asyncio.Future] = {}
+            self._http_version_logged = False
+            # Completed responses; sampled output is only reused when it is
+            # deterministic (temperature 0) or caching is explicitly enabled
+            self._cache = TTLCache(maxsize=Config.RESPONSE_CACHE_SIZE, ttl=Config.RESPONSE_CACHE_TTL)
+            self._cache_enabled = Config.TEMPERATURE == 0 or Config.CACHE_RESPONSES
+            self._semantic_cache = ResponseCache(
+                Config.GROQ_MODEL,
+                Config.EMBEDDING_MODEL,
+                maxsize=Config.SEMANTIC_CACHE_SIZE,
+                ttl=Config.SEMANTIC_CACHE_TTL,
+                threshold=Config.SEMANTIC_CACHE_THRESHOLD
+            )
+            # Fail fast on connect; generations themselves can take a while
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                http2=True,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "Accept": "application/json"
+                }
+            )
             logger.info(f"Initialized LLMGenerator with model: {self.model}")
         except Exception as e:
             logger.error(f"Error initializing LLMGenerator: {str(e)}")
             raise
+
+    async def close(self):
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
             
     def _construct_prompt(self, topic: str) -> str:
-        """Construct a prompt for the LLM to generate LinkedIn posts."""
-        return Config.LINKEDIN_POST_PROMPT + f"\n\nTopic: {topic}"
-    
-    def _construct_system_message(self) -> Dict[str, str]:
-        """Construct a system message for the LLM."""
-        return {
-            "role": "system",
-            "content": "You are a professional LinkedIn content creator specializing in Hinglish content. Your task is to create engaging, professional posts according to the user's requirements."
-        }
+        """Construct the per-request user message; the instructions are in the system message."""
+        return self._PROMPT_PREFIX + topic
     
+    @staticmethod
+    def _log_prompt_cache(result: Dict[str, Any]) -> None:
+        """Log how much of the prompt Groq served from its prefix cache."""
+        usage = result.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") \
+            or result.get("x_groq", {}).get("usage", {}).get("cached_tokens", 0)
+        if prompt_tokens:
+            logger.info(f"Prompt cache: {cached_tokens}/{prompt_tokens} tokens cached ({cached_tokens / prompt_tokens:.0%})")
+
     def _validate_post(self, post: Dict[str, Any]) -> bool:
         """Validate a single post against required format."""
         try:
-            # Check required fields
-            if not all(key in post for key in ['title', 'content', 'post', 'schedule']):
-                raise PostValidationError("Missing required fields in post")
-            
-            # Validate title
-            if not isinstance(post['title'], str) or len(post['title'].split()) > 8:
-                raise PostValidationError("Invalid title format or length")
-            
-            # Validate content
-            content = post['content']
-            paragraphs = content.split('\n\n')
-            if len(paragraphs) < 4:  # 4 paragraphs + hashtags
-                raise PostValidationError("Insufficient paragraphs in content")
-            
-            # Validate hashtags
-            hashtags = [tag for tag in content.split() if tag.startswith('#')]
-            if not (3 <= len(hashtags) <= 5):
-                raise PostValidationError("Invalid number of hashtags")
-            
-            # Validate boolean fields
-            if not isinstance(post['post'], bool):
-                raise PostValidationError("Invalid post field type")
-            if post['schedule'] is not None and not isinstance(post['schedule'], str):
-                raise PostValidationError("Invalid schedule field type")
-            
+            _validate_post_schema(post)
             return True
-            
-        except Exception as e:
-            logger.error(f"Post validation error: {str(e)}")
+        except fastjsonschema.JsonSchemaException as e:
+            logger.error(f"Post validation error: {e.message}")
             return False
     
     def _validate_response(self, data: Dict[str, Any]) -> bool:
         """Validate the complete LLM response."""
         try:
-            if not isinstance(data, dict):
-                raise PostValidationError("Response is not a dictionary")
-            
-            if 'posts' not in data:
-                raise PostValidationError("Missing 'posts' array in response")
-            
-            if not isinstance(data['posts'], list) or len(data['posts']) != 4:
-                raise PostValidationError("Invalid number of posts")
-            
-            # Validate each post
-            for post in data['posts']:
-                if not self._validate_post(post):
-                    raise PostValidationError("Invalid post format")
-            
+            _validate_response_schema(data)
             return True
-            
-        except Exception as e:
-            logger.error(f"Response validation error: {str(e)}")
+        except fastjsonschema.JsonSchemaException as e:
+            logger.error(f"Response validation error: {e.message}")
             return False
     
-    async def generate_posts_async(self, topic: str, chat_history: Optional[List[dict]] = None) -> Dict[str, Any]:
-        """Generate LinkedIn posts asynchronously."""
+    def _request_key(self, topic: str, chat_history: Optional[List[dict]]) -> str:
+        """Hash the inputs that determine a generation request."""
+        params = f"{topic}|{self.model}|{Config.TEMPERATURE}|{Config.TOP_P}|"
+        payload = params.encode() + orjson.dumps(chat_history or [], option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    async def generate_posts_async(
+        self,
+        topic: str,
+        chat_history: Optional[List[dict]] = None,
+        bypass_cache: bool = False
+    ) -> Dict[str, Any]:
+        """Generate LinkedIn posts asynchronously.
+
+        Concurrent calls for the same topic and chat history share a single
+        upstream request and receive the same result. When response caching
+        is enabled, repeat requests are served from the cache unless
+        bypass_cache is set, and requests without chat history may also be
+        answered from a cached near-duplicate topic.
+        """
+        key = self._request_key(topic, chat_history)
+        use_cache = self._cache_enabled and not bypass_cache
+        if use_cache:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        # Similar topics only share an answer when there is no conversation context
+        use_semantic = use_cache and not chat_history
+        if use_semantic:
+            topic_key = self._semantic_cache.key(topic)
+            cached = self._semantic_cache.get(topic_key)
+            if cached is not None:
+                return cached
+            embedding = await asyncio.to_thread(self._semantic_cache.embed, topic)
+            cached = self._semantic_cache.get_similar(embedding)
+            if cached is not None:
+                return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_posts(topic, chat_history))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller being cancelled does not cancel the others
+        result = await asyncio.shield(task)
+
+        if use_cache:
+            self._cache[key] = result
+        if use_semantic:
+            self._semantic_cache.put(topic_key, result, embedding)
+        return result
+
+    def _build_messages(self, topic: str, chat_history: Optional[List[dict]] = None) -> List[Dict[str, str]]:
+        """Assemble the chat messages for a generation request."""
         messages = []
         
         # Add system message
-        messages.append(self._construct_system_message())
+        messages.append(_SYSTEM_MESSAGE)
         
         # Add chat history if provided
         if chat_history:
@@ -124,119 +263,125 @@ class LLMGenerator:
             "role": "user",
             "content": self._construct_prompt(topic)
         })
-        
+        return messages
+
+    async def _request_posts(self, topic: str, chat_history: Optional[List[dict]] = None) -> Dict[str, Any]:
+        """Request posts from the LLM, retrying transient failures."""
+        # Serialize once; retries resend the same body
+        body = orjson.dumps({**self._BASE_PAYLOAD, "messages": self._build_messages(topic, chat_history)})
         retry_count = 0
         last_error = None
         
         while retry_count < self.max_retries:
+            retry_after = 0.0
+            delay = None
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(
-                        f"{self.api_base}/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": self.model,
-                            "messages": messages,
-                            "temperature": Config.TEMPERATURE,
-                            "max_tokens": Config.MAX_TOKENS,
-                            "top_p": Config.TOP_P,
-                            "frequency_penalty": Config.FREQUENCY_PENALTY,
-                            "presence_penalty": Config.PRESENCE_PENALTY,
-                            "response_format": {"type": "json_object"}
-                        }
-                    )
-                    
-                    response.raise_for_status()
-                    result = response.json()
-                    
-                    # Extract and validate content
-                    content = result["choices"][0]["message"]["content"]
-                    data = json.loads(content)
-                    
-                    if self._validate_response(data):
-                        return result
-                    else:
-                        raise PostValidationError("Response validation failed")
-                    
+                response = await self._client.post(
+                    f"{self.api_base}/chat/completions",
+                    content=body
+                )
+                
+                response.raise_for_status()
+                if not self._http_version_logged:
+                    logger.info(f"Groq API negotiated {response.http_version}")
+                    self._http_version_logged = True
+                result = orjson.loads(response.content)
+                self._log_prompt_cache(result)
+                
+                # Extract and validate content
+                content = result["choices"][0]["message"]["content"]
+                data = orjson.loads(content)
+                
+                if self._validate_response(data):
+                    return result
+                else:
+                    raise PostValidationError("Response validation failed")
+                
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if status < 500 and status not in _RETRYABLE_CLIENT_STATUS:
+                    logger.error(f"Groq API rejected request ({status}): {e.response.text}")
+                    raise
+                # 429 and 5xx: back off, honouring Retry-After when present
+                last_error = e
+                retry_after = _retry_after(e.response)
+            except httpx.TimeoutException as e:
+                last_error = e
+                delay = _TIMEOUT_RETRY_DELAY
             except Exception as e:
                 last_error = e
-                logger.error(f"Error generating posts (try {retry_count + 1}/{self.max_retries}): {str(e)}")
-                retry_count += 1
-                await asyncio.sleep(1)  # Wait before retrying
+
+            logger.error(f"Error generating posts (try {retry_count + 1}/{self.max_retries}): {str(last_error)}")
+            if delay is None:
+                delay = min(_MAX_DELAY, 2 ** retry_count) + random.uniform(0, _JITTER)
+            retry_count += 1
+            if retry_count < self.max_retries:
+                await asyncio.sleep(max(delay, retry_after))
         
         # If we've exhausted retries, raise the last error
         raise Exception(f"Failed to generate posts after {self.max_retries} retries. Last error: {str(last_error)}")
     
-    def generate_posts(self, topic: str, chat_history: Optional[List[dict]] = None) -> List[Dict[str, Any]]:
-        """Generate LinkedIn posts synchronously."""
-        try:
-            result = asyncio.run(self.generate_posts_async(topic, chat_history))
-            content = result["choices"][0]["message"]["content"]
-            data = json.loads(content)
-            
-            if self._validate_response(data):
-                return data["posts"]
-            else:
-                raise PostValidationError("Response validation failed")
-                
-        except Exception as e:
-            logger.error(f"Error in generate_posts: {str(e)}")
-            return [{
-                "title": "Error Generating Posts",
-                "content": "We encountered an error while generating your posts. Please try again.",
-                "post": False,
-                "schedule": None
-            }]
-
-async def generate_posts_stream(topic: str) -> AsyncGenerator[Dict[str, Any], None]:
-    """Stream generate LinkedIn posts for a topic."""
+    async def stream_posts_async(
+        self,
+        topic: str,
+        chat_history: Optional[List[dict]] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Generate LinkedIn posts, yielding each one as soon as Groq finishes it.
+
+        Uses Groq's SSE mode and parses the JSON content incrementally, so the
+        first post arrives long before the full response would. Posts are
+        validated one at a time; nothing is cached and there are no retries,
+        since a failure can happen after posts have already been yielded.
+        """
+        body = orjson.dumps({**self._BASE_PAYLOAD, "messages": self._build_messages(topic, chat_history), "stream": True})
+        posts = ijson.sendable_list()
+        parser = ijson.items_coro(posts, "posts.item")
+
+        async with self._client.stream("POST", f"{self.api_base}/chat/completions", content=body) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = orjson.loads(data)
+                if not chunk["choices"]:
+                    continue
+                delta = chunk["choices"][0]["delta"].get("content")
+                if not delta:
+                    continue
+                parser.send(delta.encode())
+                for post in posts:
+                    if not self._validate_post(post):
+                        raise PostValidationError("Post validation failed")
+                    yield post
+                del posts[:]
+        parser.close()
+
+async def generate_posts_stream(topic: str, pace: bool = False) -> AsyncGenerator[Dict[str, Any], None]:
+    """Stream generate LinkedIn posts for a topic.
+
+    Yields one chunk per post carrying its title, paragraphs and hashtags,
+    as soon as the post has been generated; pass pace=True to restore a
+    short pause between posts.
+    """
     generator = LLMGenerator()
     
     try:
-        result = await generator.generate_posts_async(topic)
-        content = result["choices"][0]["message"]["content"]
-        data = json.loads(content)
-        
-        if not generator._validate_response(data):
-            raise PostValidationError("Response validation failed")
-        
-        # Stream each post separately
-        for post in data["posts"]:
-            # Stream title
+        # Stream each post as soon as it has been generated
+        async for post in generator.stream_posts_async(topic):
+            paragraphs, hashtags = _tokenize_post(post["content"])
             yield {
-                "type": "title",
-                "content": post["title"],
+                "type": "post",
+                "title": post["title"],
+                "paragraphs": paragraphs,
+                "hashtags": ' '.join(hashtags),
                 "model": generator.model,
                 "timestamp": datetime.now().isoformat()
             }
-            await asyncio.sleep(0.2)
-            
-            # Stream content paragraphs
-            paragraphs = post["content"].split('\n\n')
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    yield {
-                        "type": "paragraph",
-                        "content": paragraph,
-                        "model": generator.model,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    await asyncio.sleep(0.1)
-            
-            # Stream hashtags
-            hashtags = [tag for tag in post["content"].split() if tag.startswith('#')]
-            if hashtags:
-                yield {
-                    "type": "hashtags",
-                    "content": ' '.join(hashtags),
-                    "model": generator.model,
-                    "timestamp": datetime.now().isoformat()
-                }
-            
-            await asyncio.sleep(0.3)  # Pause between posts
+            if pace:
+                await asyncio.sleep(0.3)  # Pause between posts
             
     except Exception as e:
         logger.error(f"Error in streaming generation: {str(e)}")
@@ -246,3 +391,5 @@ async def generate_posts_stream(topic: str) -> AsyncGenerator[Dict[str, Any], No
             "model": generator.model,
             "timestamp": datetime.now().isoformat()
         }
+    finally:
+        await generator.close()
@@ -1,20 +1,28 @@
 from fastapi import FastAPI, UploadFile, File, Form, WebSocket, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Tuple
+from collections import deque
+from operator import itemgetter
+import asyncio
+import bisect
+from functools import cached_property
 import os
-import shutil
-import httpx
-import json
+import aiofiles
+from cachetools import TTLCache
+import anyio.to_thread
 from dotenv import load_dotenv
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 import uvicorn
-from app.api.routes import router as api_router
+from contextlib import asynccontextmanager
+from sqlalchemy import Row, insert, select
 from app.api.websocket import handle_websocket
 from app.core.config import settings
 from app.services.llm_generator import LLMGenerator
+from app.services.response_cache import ResponseCache
+from app.services import linkedin_service, post_generator
 from app.models.schemas import ChatRequest, ChatResponse, ErrorResponse
 
 # Import core components
@@ -34,9 +42,185 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+UPLOADS_DIR = "uploads"
+# Uploads are copied to disk in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+def _sendfile_upload(src_fd: int, file_path: str) -> None:
+    """Copy an on-disk upload to file_path inside the kernel with sendfile."""
+    dst_fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        offset = 0
+        while sent := os.sendfile(dst_fd, src_fd, offset, UPLOAD_CHUNK_SIZE):
+            offset += sent
+    finally:
+        os.close(dst_fd)
+
+# Per-session state kept in memory; scheduled posts are also persisted.
+# At most SESSION_CACHE_SIZE sessions are kept, each for SESSION_CACHE_TTL
+# seconds after it was created, and each keeps its latest
+# SESSION_MAX_MESSAGES messages.
+SESSION_CACHE_SIZE = 10_000
+SESSION_CACHE_TTL = 24 * 60 * 60
+SESSION_MAX_MESSAGES = 200
+
+def _estimate_tokens(content: str) -> int:
+    # Rough estimate, ~3 characters per token
+    return len(content) // 3
+
+class SessionState:
+    """A conversation kept server-side, with totals updated as messages arrive.
+
+    The latest user message and an estimated token count are maintained on
+    append, so neither requires rescanning the history. Once full, the
+    oldest message is dropped for each new one and leaves the total.
+    """
+
+    def __init__(self, max_messages: int = SESSION_MAX_MESSAGES):
+        self.messages: Deque[dict] = deque(maxlen=max_messages)
+        self.last_user: Optional[str] = None
+        self.token_total = 0
+
+    def append(self, message: dict) -> None:
+        if len(self.messages) == self.messages.maxlen:
+            self.token_total -= _estimate_tokens(self.messages[0]["content"])
+        self.messages.append(message)
+        if message["role"] == "user":
+            self.last_user = message["content"]
+        self.token_total += _estimate_tokens(message["content"])
+
+_session_posts = models.SessionScheduledPost.__table__
+
+def _session_post(row: Row) -> dict:
+    return {
+        "content": row.content,
+        "schedule_time": row.schedule_time.isoformat(),
+        "created_at": row.created_at.isoformat(),
+        "status": row.status
+    }
+
+def _save_session_post(session_id: str, content: str, schedule_time: datetime) -> dict:
+    """Persist a session's scheduled post and return it as the API dict."""
+    values = {
+        "session_id": session_id,
+        "content": content,
+        "schedule_time": schedule_time,
+        "created_at": datetime.now(),
+        "status": "scheduled"
+    }
+    with engine.begin() as conn:
+        conn.execute(insert(_session_posts).values(**values))
+    return {
+        "content": content,
+        "schedule_time": schedule_time.isoformat(),
+        "created_at": values["created_at"].isoformat(),
+        "status": values["status"]
+    }
+
+def _load_session_posts(session_id: str) -> List[Tuple[datetime, dict]]:
+    """Load a session's scheduled posts as (schedule_time, post) pairs in schedule order."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(_session_posts)
+            .where(_session_posts.c.session_id == session_id)
+            .order_by(_session_posts.c.schedule_time)
+        ).all()
+    return [(row.schedule_time, _session_post(row)) for row in rows]
+
+def _model_response(model: BaseModel) -> Response:
+    """Serialize a response model straight to JSON bytes with pydantic-core.
+
+    Returning a Response skips FastAPI's response_model validation and
+    jsonable_encoder pass; the model was already validated when built.
+    """
+    return Response(model.model_dump_json(), media_type="application/json")
+
+def _response_cache() -> Optional[ResponseCache]:
+    """Build a response cache, or None when sampled output must not be reused."""
+    if settings.TEMPERATURE != 0 and not settings.CACHE_RESPONSES:
+        return None
+    return ResponseCache(
+        settings.GROQ_MODEL,
+        settings.EMBEDDING_MODEL,
+        maxsize=settings.RESPONSE_CACHE_SIZE,
+        ttl=settings.RESPONSE_CACHE_TTL,
+        threshold=settings.RESPONSE_CACHE_THRESHOLD
+    )
+
+async def _cached_call(
+    cache: Optional[ResponseCache],
+    chat_history: List[dict],
+    call: Callable[[], Awaitable[Any]],
+    store: Callable[[Any], bool] = bool
+) -> Any:
+    """Return call()'s result, answering from cache when possible.
+
+    Conversations match exactly; a single-message conversation may also be
+    answered from a cached near-duplicate message. Results are only cached
+    when store(result) is true.
+    """
+    if cache is None:
+        return await call()
+
+    key = cache.key("\n".join(f"{message['role']}: {message['content']}" for message in chat_history))
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    embedding = None
+    if len(chat_history) == 1:
+        embedding = await asyncio.to_thread(cache.embed, chat_history[0]["content"])
+        result = cache.get_similar(embedding)
+        if result is not None:
+            return result
+
+    result = await call()
+    if store(result):
+        cache.put(key, result, embedding)
+    return result
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up shared resources on startup and release them on shutdown."""
+    try:
+        # Create database tables
+        models.Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created successfully")
+        os.makedirs(UPLOADS_DIR, exist_ok=True)
+
+        # Sync dependencies such as get_db run on anyio's thread pool,
+        # which only has 40 threads by default
+        anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+        
+        # Log startup information
+        logger.info(f"Starting {settings.PROJECT_NAME} v{settings.PROJECT_VERSION}")
+        logger.info(f"Environment: {'Development' if settings.DEBUG else 'Production'}")
+        logger.info(f"Documentation: http://localhost:{settings.PORT}/docs")
+        
+    except Exception as e:
+        logger.error(f"Error during startup: {str(e)}")
+        raise
+
+    # One generator (and its pooled HTTP client) for the app's lifetime
+    app.state.llm_generator = LLMGenerator()
+    app.state.chat_cache = _response_cache()
+    app.state.posts_cache = _response_cache()
+    # Load the embedding model now rather than on the first cached request
+    for cache in (app.state.chat_cache, app.state.posts_cache):
+        if cache is not None:
+            await asyncio.to_thread(cache.warm_up)
+    try:
+        yield
+    finally:
+        await app.state.llm_generator.close()
+        await linkedin_service.close_client()
+        await post_generator.close_client()
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
         title=settings.PROJECT_NAME,
         version=settings.PROJECT_VERSION,
         description="API backend for LinkedIn Post Generator using LLM",
@@ -61,7 +245,7 @@ def create_app() -> FastAPI:
     async def global_exception_handler(request: Request, exc: Exception):
         """Handle all unhandled exceptions."""
         logger.error(f"Global error handler caught: {str(exc)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "error",
@@ -71,30 +255,11 @@ def create_app() -> FastAPI:
             }
         )
 
-    # Startup event handler
-    @app.on_event("startup")
-    async def startup_event():
-        """Initialize database and other startup tasks."""
-        try:
-            # Create database tables
-            models.Base.metadata.create_all(bind=engine)
-            logger.info("Database tables created successfully")
-            
-            # Log startup information
-            logger.info(f"Starting {settings.PROJECT_NAME} v{settings.PROJECT_VERSION}")
-            logger.info(f"Environment: {'Development' if settings.DEBUG else 'Production'}")
-            logger.info(f"Documentation: http://localhost:{settings.PORT}/docs")
-            
-        except Exception as e:
-            logger.error(f"Error during startup: {str(e)}")
-            raise
-
-    # Initialize LLM generator
-    llm_generator = LLMGenerator()
-
-    # In-memory storage for conversations and scheduled posts
-    conversations: Dict[str, List[dict]] = {}
-    scheduled_posts: Dict[str, List[dict]] = {}
+    # Bounded in-memory state for conversations and scheduled posts. Scheduled
+    # posts are stored in the database and loaded back on a cache miss, as
+    # (schedule_time, post) pairs kept sorted by schedule time.
+    conversations: TTLCache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)  # session_id -> SessionState
+    scheduled_posts: TTLCache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
 
     # Define the input model
     class PostData(BaseModel):
@@ -118,11 +283,21 @@ def create_app() -> FastAPI:
     class Message(BaseModel):
         role: str
         content: str
-        timestamp: str = datetime.now().isoformat()
+        timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
     class ChatRequest(BaseModel):
         messages: List[Message]
         model: Optional[str] = None
+        # With a session_id, messages holds only what is new since the last request
+        session_id: Optional[str] = None
+
+        def history(self) -> List[dict]:
+            """Return the messages as role/content dicts for the LLM."""
+            return self.model_dump(include={"messages": {"__all__": {"role", "content"}}})["messages"]
+
+        @cached_property
+        def last_user_content(self) -> Optional[str]:
+            return next((msg.content for msg in reversed(self.messages) if msg.role == "user"), None)
 
     class ChatResponse(BaseModel):
         response: str
@@ -133,18 +308,29 @@ def create_app() -> FastAPI:
     class ScheduleRequest(BaseModel):
         session_id: str
         post_content: str
-        schedule_time: str
+        schedule_time: datetime
 
     class ScheduleResponse(BaseModel):
         status: str
         message: str
         scheduled_post: Optional[dict] = None
 
+    def _session(request: ChatRequest) -> Optional[SessionState]:
+        """Append the request's messages to its session, if it names one."""
+        if request.session_id is None:
+            return None
+        state = conversations.get(request.session_id)
+        if state is None:
+            state = conversations[request.session_id] = SessionState()
+        for message in request.history():
+            state.append(message)
+        return state
+
     # OPTIONS route handler for all routes
     @app.options("/{full_path:path}")
     async def options_route(request: Request, full_path: str):
         """Handle OPTIONS requests for all routes."""
-        return JSONResponse(
+        return ORJSONResponse(
             content={},
             headers={
                 "Access-Control-Allow-Origin": "*",
@@ -180,6 +366,29 @@ def create_app() -> FastAPI:
     async def websocket_endpoint(websocket: WebSocket):
         await handle_websocket(websocket)
 
+    async def _generate_posts_impl(
+        topic: str,
+        chat_history: List[dict],
+        key_history: Optional[List[dict]] = None
+    ) -> Tuple[List[str], bool]:
+        """Generate posts for /generate-posts and /posts.
+
+        chat_history is passed to the generator as is. key_history, the
+        response cache key, defaults to chat_history and must include the
+        topic when chat_history does not.
+        """
+        if not settings.GROQ_API_KEY:
+            raise HTTPException(
+                status_code=500,
+                detail="Configuration error: GROQ_API_KEY is not set"
+            )
+        return await _cached_call(
+            app.state.posts_cache,
+            key_history if key_history is not None else chat_history,
+            lambda: app.state.llm_generator.generate_posts(topic, chat_history),
+            store=itemgetter(1)
+        )
+
     @app.post("/generate-posts", response_model=PostResponse, responses={
         500: {"model": ErrorResponse}
     })
@@ -199,7 +408,11 @@ def create_app() -> FastAPI:
                 )
             
             # Generate posts
-            posts = llm_generator.generate_posts(request.topic, request.chat_history)
+            # generate_posts adds the topic to the prompt itself, so it is
+            # only appended to the cache key
+            chat_history = request.chat_history or []
+            key_history = [*chat_history, {"role": "user", "content": request.topic}]
+            posts, _ = await _generate_posts_impl(request.topic, chat_history, key_history)
             
             # Validate posts
             if not posts or len(posts) == 0:
@@ -213,7 +426,7 @@ def create_app() -> FastAPI:
                 )
             
             logger.info(f"Successfully generated {len(posts)} posts")
-            return PostResponse(posts=posts)
+            return _model_response(PostResponse(posts=posts))
             
         except HTTPException as he:
             logger.error(f"HTTP Exception: {str(he)}")
@@ -232,12 +445,15 @@ def create_app() -> FastAPI:
     @app.post("/upload/")
     async def upload_file(file: UploadFile = File(...)):
         try:
-            uploads_dir = "uploads"
-            os.makedirs(uploads_dir, exist_ok=True)
-
-            file_path = os.path.join(uploads_dir, file.filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            file_path = os.path.join(UPLOADS_DIR, file.filename)
+            # Large uploads are already spooled to a temp file; copy those
+            # file-to-file in the kernel. Small in-memory ones are streamed.
+            if hasattr(os, "sendfile") and getattr(file.file, "_rolled", False):
+                await asyncio.to_thread(_sendfile_upload, file.file.fileno(), file_path)
+            else:
+                async with aiofiles.open(file_path, "wb") as buffer:
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        await buffer.write(chunk)
 
             return {"filename": file.filename, "message": "File uploaded successfully"}
         except Exception as e:
@@ -266,21 +482,25 @@ def create_app() -> FastAPI:
                 )
             
             # Convert messages to chat history format
-            chat_history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in request.messages
-            ]
+            state = _session(request)
+            chat_history = list(state.messages) if state else request.history()
             
             # Generate response using LLM
-            response_text = await llm_generator.generate_chat_response(chat_history)
+            response_text = await _cached_call(
+                app.state.chat_cache,
+                chat_history,
+                lambda: app.state.llm_generator.generate_chat_response(chat_history)
+            )
+            if state:
+                state.append({"role": "assistant", "content": response_text})
             
             # Create response
-            return ChatResponse(
+            return _model_response(ChatResponse(
                 response=response_text,
                 posts=[],  # No posts generated in chat mode
                 status="success",
                 conversation_history=chat_history
-            )
+            ))
             
         except ValueError as e:
             logger.error(f"Validation error: {str(e)}")
@@ -295,39 +515,43 @@ def create_app() -> FastAPI:
                 detail=f"Error processing request: {str(e)}"
             )
 
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest):
+        """Stream the chat reply as server-sent events while it is generated."""
+        state = _session(request)
+        chat_history = list(state.messages) if state else request.history()
+        on_complete = (lambda text: state.append({"role": "assistant", "content": text})) if state else None
+        return StreamingResponse(
+            app.state.llm_generator.astream_chat_response(chat_history, on_complete),
+            media_type="text/event-stream",
+            # Keep proxies such as nginx from buffering the stream
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
     @app.post("/posts", response_model=ChatResponse, responses={500: {"model": ErrorResponse}})
-    async def generate_posts(request: ChatRequest):
+    async def generate_chat_posts(request: ChatRequest):
         """Generate multiple LinkedIn posts based on chat request."""
         try:
-            # Validate API key
-            if not settings.GROQ_API_KEY:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Configuration error: GROQ_API_KEY is not set"
-                )
-            
-            # Convert messages to chat history format
-            chat_history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in request.messages
-            ]
-            
-            # Get the last user message as the topic
-            topic = next(
-                (msg.content for msg in reversed(request.messages) if msg.role == "user"),
-                "Generate LinkedIn posts"
-            )
+            # Convert messages to chat history format, and take the last
+            # user message as the topic
+            state = _session(request)
+            if state:
+                chat_history, topic = list(state.messages), state.last_user
+                logger.debug(f"Session {request.session_id}: {len(chat_history)} messages, ~{state.token_total} tokens")
+            else:
+                chat_history, topic = request.history(), request.last_user_content
+            topic = topic or "Generate LinkedIn posts"
             
             # Generate posts
-            posts, should_post = llm_generator.generate_posts(topic, chat_history)
+            posts, should_post = await _generate_posts_impl(topic, chat_history)
             
             # Create response
-            return ChatResponse(
+            return _model_response(ChatResponse(
                 response="Generated LinkedIn posts",
                 posts=posts,
                 status="success",
                 conversation_history=chat_history
-            )
+            ))
             
         except ValueError as e:
             logger.error(f"Validation error: {str(e)}")
@@ -344,39 +568,35 @@ def create_app() -> FastAPI:
 
     @app.post("/schedule-post", response_model=ScheduleResponse)
     async def schedule_post(request: ScheduleRequest):
+        # Parsed by pydantic; times with an offset are stored as naive local
+        # time like the rest, so they compare and sort together
+        schedule_time = request.schedule_time
+        if schedule_time.tzinfo is not None:
+            schedule_time = schedule_time.astimezone().replace(tzinfo=None)
+        if schedule_time < datetime.now():
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "status": "error",
+                    "message": "Schedule time must be in the future"
+                }
+            )
+
         try:
-            # Validate schedule time
-            try:
-                schedule_time = datetime.fromisoformat(request.schedule_time)
-                if schedule_time < datetime.now():
-                    raise ValueError("Schedule time must be in the future")
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "status": "error",
-                        "message": str(e)
-                    }
-                )
-            
-            # Store scheduled post
-            if request.session_id not in scheduled_posts:
-                scheduled_posts[request.session_id] = []
-            
-            scheduled_post = {
-                "content": request.post_content,
-                "schedule_time": request.schedule_time,
-                "created_at": datetime.now().isoformat(),
-                "status": "scheduled"
-            }
-            
-            scheduled_posts[request.session_id].append(scheduled_post)
+            # Store scheduled post; a session not in memory is loaded from
+            # the database, including this post, on its next read
+            scheduled_post = await asyncio.to_thread(
+                _save_session_post, request.session_id, request.post_content, schedule_time
+            )
+            session_posts = scheduled_posts.get(request.session_id)
+            if session_posts is not None:
+                bisect.insort(session_posts, (schedule_time, scheduled_post), key=itemgetter(0))
             
-            return ScheduleResponse(
+            return _model_response(ScheduleResponse(
                 status="success",
                 message="Post scheduled successfully",
                 scheduled_post=scheduled_post
-            )
+            ))
             
         except Exception as e:
             logger.error(f"Error scheduling post: {str(e)}")
@@ -391,9 +611,11 @@ def create_app() -> FastAPI:
     @app.get("/scheduled-posts/{session_id}")
     async def get_scheduled_posts(session_id: str):
         try:
-            if session_id not in scheduled_posts:
-                return {"posts": []}
-            return {"posts": scheduled_posts[session_id]}
+            session_posts = scheduled_posts.get(session_id)
+            if session_posts is None:
+                session_posts = await asyncio.to_thread(_load_session_posts, session_id)
+                scheduled_posts[session_id] = session_posts
+            return {"posts": [post for _, post in session_posts]}
         except Exception as e:
             logger.error(f"Error getting scheduled posts: {str(e)}")
             raise HTTPException(
@@ -432,10 +654,19 @@ app = create_app()
 
 # Run the server
 if __name__ == "__main__":
+    # uvloop has no Windows build; fall back to the stdlib loop there
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+
     uvicorn.run(
         "main:app",
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        log_level="info"
+        log_level="info",
+        loop=loop,
+        http="httptools"
     )
@@ -36,10 +36,14 @@ if (-not $redisStarted) {
 # Get Python path
 $pythonPath = (Get-Command python).Path
 
-# Start Celery worker
+# Start Celery workers, one per queue. linkedin_io stays on prefork rather
+# than gevent: publish_post runs async httpx on its own event loop, which
+# gevent's monkey-patching does not make cooperative.
 try {
-    Start-Process -FilePath $pythonPath -ArgumentList "-m celery -A app.worker worker --loglevel=info" -NoNewWindow
-    Write-Host "Celery worker started successfully"
+    Start-Process -FilePath $pythonPath -ArgumentList "-m celery -A app.worker worker -Q linkedin_io -c 8 -Ofair --prefetch-multiplier=1 -n linkedin_io@%h --loglevel=info" -NoNewWindow
+    Start-Process -FilePath $pythonPath -ArgumentList "-m celery -A app.worker worker -Q ai -c 4 -Ofair --prefetch-multiplier=1 -n ai@%h --loglevel=info" -NoNewWindow
+    Start-Process -FilePath $pythonPath -ArgumentList "-m celery -A app.worker worker -Q default -c 2 -Ofair --prefetch-multiplier=1 -n default@%h --loglevel=info" -NoNewWindow
+    Write-Host "Celery workers started successfully"
 } catch {
     Write-Host "Failed to start Celery worker. Please make sure Celery is installed: pip install celery"
     exit 1
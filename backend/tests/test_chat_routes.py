@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+from app.services.response_cache import ResponseCache
+
+class FakeGenerator:
+    """Records what the routes pass to the LLM generator."""
+
+    def __init__(self):
+        self.post_calls = []
+        self.chat_calls = []
+
+    async def stream_chat_response(self, user_message, chat_history):
+        self.chat_calls.append([*chat_history, {"role": "user", "content": user_message}])
+        yield {"type": "chunk", "content": f"Echo: {user_message}"}
+
+    async def generate_chat_response(self, chat_history):
+        self.chat_calls.append(list(chat_history))
+        return f"reply {len(self.chat_calls)}"
+
+    async def generate_posts(self, topic, chat_history=None):
+        self.post_calls.append((topic, chat_history))
+        return [f"Post about {topic}"], True
+
+_axes = {}
+
+def _unit_embedding(text: str) -> np.ndarray:
+    """Embed each distinct text on its own axis, so only repeats are similar."""
+    embedding = np.zeros(32, dtype=np.float32)
+    embedding[_axes.setdefault(text, len(_axes))] = 1.0
+    return embedding
+
+@pytest.fixture
+def generator():
+    return FakeGenerator()
+
+@pytest.fixture
+def client(generator, monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    app = main.create_app()
+    cache = ResponseCache("test-model", "test-embedder", maxsize=16, ttl=60, threshold=0.9)
+    monkeypatch.setattr(cache, "embed", _unit_embedding)
+    app.state.llm_generator = generator
+    app.state.chat_cache = None
+    app.state.posts_cache = cache
+    return TestClient(app)
+
+def test_generate_posts_sends_topic_once(client, generator):
+    history = [{"role": "user", "content": "I work in fintech"}]
+
+    response = client.post("/generate-posts", json={"topic": "AI agents", "chat_history": history})
+
+    assert response.status_code == 200
+    assert response.json()["posts"] == ["Post about AI agents"]
+    assert generator.post_calls == [("AI agents", history)]
+
+def test_generate_posts_cache_key_includes_topic(client, generator):
+    for topic in ("AI agents", "AI agents", "Remote work"):
+        assert client.post("/generate-posts", json={"topic": topic}).status_code == 200
+
+    assert [topic for topic, _ in generator.post_calls] == ["AI agents", "Remote work"]
+
+def test_session_keeps_running_totals_across_requests(client, generator, monkeypatch):
+    sessions = []
+
+    class RecordingSessionState(main.SessionState):
+        def __init__(self):
+            super().__init__()
+            sessions.append(self)
+
+    monkeypatch.setattr(main, "SessionState", RecordingSessionState)
+
+    first = client.post("/chat", json={
+        "session_id": "session-1",
+        "messages": [{"role": "user", "content": "Write about fintech"}]
+    })
+    second = client.post("/chat", json={
+        "session_id": "session-1",
+        "messages": [{"role": "user", "content": "Make it shorter please"}]
+    })
+
+    assert first.status_code == second.status_code == 200
+    assert len(sessions) == 1
+    state = sessions[0]
+    contents = ["Write about fintech", "reply 1", "Make it shorter please", "reply 2"]
+    assert [message["content"] for message in state.messages] == contents
+    assert state.last_user == "Make it shorter please"
+    assert state.token_total == sum(len(content) // 3 for content in contents)
+    # Only the new message was sent, but the generator saw the whole conversation
+    assert [message["content"] for message in generator.chat_calls[1]] == contents[:3]
+
+def test_session_state_drops_oldest_messages_from_totals():
+    state = main.SessionState(max_messages=2)
+    for content in ("a" * 30, "b" * 60, "c" * 90):
+        state.append({"role": "user", "content": content})
+
+    assert [message["content"][0] for message in state.messages] == ["b", "c"]
+    assert state.token_total == 20 + 30
+    assert state.last_user == "c" * 90
+
+def test_websocket_uses_the_app_generator(client, generator):
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_text('{"message": "hello", "chat_history": []}')
+
+        assert websocket.receive_json() == {"type": "chunk", "content": "Echo: hello"}
+        assert websocket.receive_json()["type"] == "complete"
+
+    assert generator.chat_calls == [[{"role": "user", "content": "hello"}]]
@@ -0,0 +1,73 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpcore
+import httpx
+import pytest
+
+from app.services import linkedin_service
+from app.services.linkedin_service import _CachingResolverBackend, _LinkedInTransport
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def _get(url: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=_LinkedInTransport(retries=0)) as client:
+        return await client.get(url)
+
+def test_transport_round_trip(server):
+    response = asyncio.run(_get(f"http://localhost:{server}/me"))
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+
+def test_transport_raises_httpx_errors():
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(_get(f"http://127.0.0.1:{_closed_port()}/me"))
+
+def test_resolver_caches_and_evicts_on_connect_failure(monkeypatch):
+    lookups = []
+
+    async def getaddrinfo(host, port, type):
+        lookups.append((host, port))
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+    monkeypatch.setattr(linkedin_service.anyio, "getaddrinfo", getaddrinfo)
+    backend = _CachingResolverBackend(ttl=60)
+    port = _closed_port()
+
+    async def connect_twice():
+        assert await backend._resolve("api.linkedin.com", port) == "127.0.0.1"
+        assert await backend._resolve("api.linkedin.com", port) == "127.0.0.1"
+        assert len(lookups) == 1
+        with pytest.raises(httpcore.ConnectError):
+            await backend.connect_tcp("api.linkedin.com", port, timeout=1)
+        await backend._resolve("api.linkedin.com", port)
+
+    asyncio.run(connect_twice())
+    assert len(lookups) == 2
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_generator import LLMGenerator
+
+@pytest.mark.parametrize("temperature, cache_responses, upstream_calls", [
+    (0.7, False, 2),
+    (0.7, True, 1),
+    (0, False, 1),
+])
+def test_chat_cache_follows_cache_settings(monkeypatch, temperature, cache_responses, upstream_calls):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "TEMPERATURE", temperature)
+    monkeypatch.setattr(settings, "CACHE_RESPONSES", cache_responses)
+    bodies = []
+
+    async def request_chat_response(body):
+        bodies.append(body)
+        return "reply"
+
+    async def chat_twice():
+        async with LLMGenerator() as generator:
+            monkeypatch.setattr(generator, "_request_chat_response", request_chat_response)
+            history = [{"role": "user", "content": "hello"}]
+            return [await generator.generate_chat_response(history) for _ in range(2)]
+
+    assert asyncio.run(chat_twice()) == ["reply", "reply"]
+    assert len(bodies) == upstream_calls
@@ -0,0 +1,96 @@
+import fastjsonschema
+import pytest
+
+from llm_generator import _tokenize_post, _validate_post_schema, _validate_response_schema
+
+CONTENT = (
+    "Hook line that grabs attention\n\n"
+    "Main insight with a story\n\n"
+    "Practical takeaway for readers\n\n"
+    "Call to action #AI #Leadership #Growth"
+)
+
+def _post(**overrides) -> dict:
+    return {"title": "AI in hiring", "content": CONTENT, "post": False, "schedule": None, **overrides}
+
+def _invalid(validate, data) -> None:
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate(data)
+
+def test_valid_post_and_response():
+    _validate_post_schema(_post())
+    _validate_post_schema(_post(post=True, schedule="2030-01-01T09:00:00"))
+    _validate_response_schema({"posts": [_post() for _ in range(4)]})
+
+@pytest.mark.parametrize("field", ["title", "content", "post", "schedule"])
+def test_post_missing_field(field):
+    post = _post()
+    del post[field]
+    _invalid(_validate_post_schema, post)
+
+@pytest.mark.parametrize("overrides", [
+    {"title": 42},
+    {"content": ["not", "a", "string"]},
+    {"post": "yes"},
+    {"schedule": 1700000000},
+])
+def test_post_wrong_types(overrides):
+    _invalid(_validate_post_schema, _post(**overrides))
+
+def test_post_title_at_most_eight_words():
+    _validate_post_schema(_post(title="one two three four five six seven eight"))
+    _invalid(_validate_post_schema, _post(title="one two three four five six seven eight nine"))
+
+def test_post_content_needs_four_paragraphs():
+    _invalid(_validate_post_schema, _post(content="One\n\nTwo\n\nThree #a #b #c"))
+
+@pytest.mark.parametrize("hashtags, valid", [
+    ("#a #b", False),
+    ("#a #b #c", True),
+    ("#a #b #c #d #e", True),
+    ("#a #b #c #d #e #f", False),
+])
+def test_post_content_hashtag_count(hashtags, valid):
+    content = f"One\n\nTwo\n\nThree\n\nFour {hashtags}"
+    if valid:
+        _validate_post_schema(_post(content=content))
+    else:
+        _invalid(_validate_post_schema, _post(content=content))
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"posts": "not a list"},
+    {"posts": [_post() for _ in range(3)]},
+    {"posts": [_post() for _ in range(5)]},
+    {"posts": [_post(), _post(), _post(), _post(post="no")]},
+])
+def test_invalid_response(data):
+    _invalid(_validate_response_schema, data)
+
+def test_tokenize_post_paragraphs_and_hashtags():
+    paragraphs, hashtags = _tokenize_post(CONTENT)
+
+    assert paragraphs == [
+        "Hook line that grabs attention",
+        "Main insight with a story",
+        "Practical takeaway for readers",
+        "Call to action #AI #Leadership #Growth"
+    ]
+    assert hashtags == ["#AI", "#Leadership", "#Growth"]
+
+def test_tokenize_post_skips_blank_paragraphs():
+    paragraphs, _ = _tokenize_post("\n\nFirst\n\n\n\n   \n\nSecond\n\n")
+
+    assert paragraphs == ["First", "Second"]
+
+def test_tokenize_post_hashtag_edge_cases():
+    _, hashtags = _tokenize_post("Email me@example.com, issue#12 and C# aside\n#StartOfLine (#NotThis) #AI,")
+
+    # Only tokens that start a word count, up to the next whitespace
+    assert hashtags == ["#StartOfLine", "#AI,"]
+
+def test_tokenize_post_emoji():
+    paragraphs, hashtags = _tokenize_post("🚀 Launch day!\n\nThanks team 🙏 #Launch🚀 #तकनीक #🎉")
+
+    assert paragraphs == ["🚀 Launch day!", "Thanks team 🙏 #Launch🚀 #तकनीक #🎉"]
+    assert hashtags == ["#Launch🚀", "#तकनीक", "#🎉"]
@@ -0,0 +1,93 @@
+import sys
+
+import numpy as np
+
+from app.services import response_cache
+from app.services.response_cache import ResponseCache
+
+def _embedding(*values: float) -> np.ndarray:
+    embedding = np.array(values, dtype=np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+def _cache(**kwargs) -> ResponseCache:
+    options = {"maxsize": 8, "ttl": 60, "threshold": 0.9, **kwargs}
+    return ResponseCache("test-model", "test-embedder", **options)
+
+def test_exact_hit_ignores_case_and_spacing():
+    cache = _cache()
+    cache.put(cache.key("AI  agents"), "cached")
+
+    assert cache.get(cache.key("ai agents")) == "cached"
+    assert cache.key("AI agents") != ResponseCache("other-model", "test-embedder", 8, 60, 0.9).key("AI agents")
+
+def test_miss_returns_none():
+    cache = _cache()
+
+    assert cache.get(cache.key("AI agents")) is None
+    assert cache.get_similar(_embedding(1, 0)) is None
+
+def test_similar_hit_at_or_above_threshold():
+    cache = _cache(threshold=0.9)
+    cache.put(cache.key("AI agents"), "cached", _embedding(1, 0))
+
+    assert cache.get_similar(_embedding(1, 0)) == "cached"
+    # cos = 0.95, above the threshold
+    assert cache.get_similar(_embedding(0.95, np.sqrt(1 - 0.95 ** 2))) == "cached"
+
+def test_similar_miss_below_threshold():
+    cache = _cache(threshold=0.9)
+    cache.put(cache.key("AI agents"), "cached", _embedding(1, 0))
+
+    # cos = 0.8, below the threshold
+    assert cache.get_similar(_embedding(0.8, 0.6)) is None
+
+def test_similar_picks_the_closest_entry():
+    cache = _cache(threshold=0.5)
+    cache.put(cache.key("first"), "first", _embedding(1, 0))
+    cache.put(cache.key("second"), "second", _embedding(0, 1))
+
+    assert cache.get_similar(_embedding(0.2, 0.98)) == "second"
+
+def test_entries_without_embedding_are_exact_only():
+    cache = _cache(threshold=0.5)
+    cache.put(cache.key("conversation"), "cached")
+
+    assert cache.get_similar(_embedding(1, 0)) is None
+
+def test_expired_entries_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = _cache(ttl=10)
+    cache.put(cache.key("AI agents"), "cached", _embedding(1, 0))
+
+    now[0] += 11
+    assert cache.get_similar(_embedding(1, 0)) is None
+    assert cache.get(cache.key("AI agents")) is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = _cache(maxsize=2)
+    cache.put("a", "a", _embedding(1, 0))
+    cache.put("b", "b", _embedding(0, 1))
+    cache.get("a")
+    cache.put("c", "c")
+
+    assert cache.get("a") == "a"
+    assert cache.get("b") is None
+    # The evicted entry no longer answers similar lookups either
+    assert cache.get_similar(_embedding(0, 1)) is None
+
+def test_missing_encoder_falls_back_to_exact_match(monkeypatch):
+    # A None entry in sys.modules makes the import fail
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+    response_cache._load_encoder.cache_clear()
+    cache = _cache()
+    try:
+        cache.warm_up()
+        embedding = cache.embed("AI agents")
+        cache.put(cache.key("AI agents"), "cached", embedding)
+
+        assert embedding is None
+        assert cache.get_similar(embedding) is None
+        assert cache.get(cache.key("ai agents")) == "cached"
+    finally:
+        response_cache._load_encoder.cache_clear()
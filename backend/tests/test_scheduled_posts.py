@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import main
+from app.db import models
+
+@pytest.fixture
+def db_engine(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(main, "engine", engine)
+    return engine
+
+def test_session_post_round_trip(db_engine):
+    later = datetime(2030, 1, 2, 9, 0)
+    sooner = datetime(2030, 1, 1, 9, 0)
+    saved = main._save_session_post("session-1", "later post", later)
+    main._save_session_post("session-1", "sooner post", sooner)
+    main._save_session_post("session-2", "other session", sooner)
+
+    loaded = main._load_session_posts("session-1")
+
+    assert [time for time, _ in loaded] == [sooner, later]
+    assert [post["content"] for _, post in loaded] == ["sooner post", "later post"]
+    assert loaded[1][1] == saved
+
+def test_schedule_post_endpoint_persists(db_engine):
+    client = TestClient(main.create_app())
+    schedule_time = (datetime.now() + timedelta(days=1)).replace(microsecond=0)
+
+    response = client.post("/schedule-post", json={
+        "session_id": "session-1",
+        "post_content": "Hello LinkedIn",
+        "schedule_time": schedule_time.isoformat()
+    })
+    assert response.status_code == 200
+    assert response.json()["scheduled_post"]["content"] == "Hello LinkedIn"
+
+    # A fresh app has nothing cached, so this read goes to the database
+    response = TestClient(main.create_app()).get("/scheduled-posts/session-1")
+    assert response.status_code == 200
+    posts = response.json()["posts"]
+    assert len(posts) == 1
+    assert posts[0]["content"] == "Hello LinkedIn"
+    assert posts[0]["schedule_time"] == schedule_time.isoformat()
@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import redis
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import models, session as db_session
+from app.db.models import Post, PostStatus, ScheduledPost
+from app.services import linkedin_service, scheduler as scheduler_module
+from app.services.scheduler import PostScheduler
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Tasks open their own sessions from app.db.session
+    monkeypatch.setattr(db_session, "SessionLocal", factory)
+    return factory
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+def _due_post(db, content: str) -> Post:
+    post = Post(content=content)
+    db.add(post)
+    db.commit()
+    PostScheduler(db).schedule_post(post.id, datetime.utcnow() - timedelta(minutes=1))
+    return post
+
+def test_schedule_and_cancel_post(db):
+    post = Post(content="Hello LinkedIn")
+    db.add(post)
+    db.commit()
+    scheduler = PostScheduler(db)
+
+    assert scheduler.schedule_post(post.id, datetime.utcnow() + timedelta(hours=1))
+    scheduled_post = db.query(ScheduledPost).filter(ScheduledPost.post_id == post.id).one()
+    assert scheduled_post.status == PostStatus.SCHEDULED.value
+    assert scheduled_post.job_id
+
+    assert scheduler.cancel_scheduled_post(post.id)
+    db.refresh(scheduled_post)
+    assert scheduled_post.status == PostStatus.CANCELLED.value
+    assert scheduled_post.post.status == PostStatus.CANCELLED
+    # Already cancelled, so a second cancel is refused
+    assert not scheduler.cancel_scheduled_post(post.id)
+
+def test_dispatch_marks_only_enqueued_posts(db, monkeypatch):
+    first = _due_post(db, "first")
+    second = _due_post(db, "second")
+    enqueued = []
+
+    def apply_async(args, task_id):
+        if args[0] == second.id:
+            raise ConnectionError("broker unavailable")
+        enqueued.append(task_id)
+
+    monkeypatch.setattr(scheduler_module.publish_post, "apply_async", apply_async)
+
+    assert scheduler_module.dispatch_due_posts() == 1
+
+    statuses = dict(db.query(ScheduledPost.post_id, ScheduledPost.status).all())
+    assert statuses == {
+        first.id: PostStatus.DISPATCHED.value,
+        second.id: PostStatus.SCHEDULED.value
+    }
+    assert len(enqueued) == 1
+
+@pytest.fixture
+def publish_guard(monkeypatch):
+    """Replace the Redis publish guard with an in-memory set."""
+    claimed = set()
+
+    def claim(post_id):
+        if post_id in claimed:
+            return False
+        claimed.add(post_id)
+        return True
+
+    monkeypatch.setattr(scheduler_module, "_claim_publish", claim)
+    monkeypatch.setattr(scheduler_module, "_release_publish", claimed.discard)
+    return claimed
+
+def _fake_create_post(monkeypatch, result):
+    calls = []
+
+    async def create_post(self, content, visibility="PUBLIC", media_category="NONE", media_url=None):
+        calls.append(content)
+        return result
+
+    monkeypatch.setattr(scheduler_module.LinkedInService, "create_post", create_post)
+    return calls
+
+def _publish(post: Post):
+    return scheduler_module.publish_post.apply(
+        args=[post.id, post.content, "PUBLIC", "NONE"]
+    )
+
+def test_publish_post_marks_post_published(db, monkeypatch, publish_guard):
+    post = _due_post(db, "publish me")
+    calls = _fake_create_post(monkeypatch, {"success": True, "post_id": "urn:li:share:1"})
+
+    assert _publish(post).get() is True
+
+    db.expire_all()
+    assert calls == ["publish me"]
+    assert db.get(Post, post.id).status == PostStatus.POSTED
+    assert db.query(ScheduledPost).filter(ScheduledPost.post_id == post.id).one().status == PostStatus.POSTED.value
+    assert post.id in publish_guard
+
+def _linkedin_responses(monkeypatch, *status_codes):
+    """Serve the given ugcPosts status codes in turn and record each request."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status_code = status_codes[min(len(requests), len(status_codes)) - 1]
+        return httpx.Response(status_code, headers={"x-restli-id": "urn:li:share:1"}, json={})
+
+    monkeypatch.setenv("LINKEDIN_ACCESS_TOKEN", "token")
+    monkeypatch.setattr(
+        linkedin_service,
+        "_get_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return requests
+
+def test_publish_post_retries_server_errors(db, monkeypatch, publish_guard):
+    post = _due_post(db, "publish me")
+    requests = _linkedin_responses(monkeypatch, 503, 201)
+
+    _publish(post)
+
+    db.expire_all()
+    assert len(requests) == 2
+    assert db.get(Post, post.id).status == PostStatus.POSTED
+
+def test_publish_post_gives_up_after_max_retries(db, monkeypatch, publish_guard):
+    post = _due_post(db, "publish me")
+    requests = _linkedin_responses(monkeypatch, 502)
+
+    _publish(post)
+
+    db.expire_all()
+    failed = db.get(Post, post.id)
+    assert len(requests) == failed.max_retries + 1
+    assert failed.status == PostStatus.FAILED
+    assert post.id not in publish_guard
+
+def test_publish_post_does_not_retry_client_errors(db, monkeypatch, publish_guard):
+    post = _due_post(db, "publish me")
+    requests = _linkedin_responses(monkeypatch, 400)
+
+    assert _publish(post).get() is False
+
+    db.expire_all()
+    assert len(requests) == 1
+    assert db.get(Post, post.id).status == PostStatus.FAILED
+
+def test_publish_post_waits_for_publish_guard(db, monkeypatch):
+    post = _due_post(db, "publish me")
+    calls = _fake_create_post(monkeypatch, {"success": True})
+    claims = []
+
+    def claim(post_id):
+        claims.append(post_id)
+        raise redis.ConnectionError("Redis unavailable")
+
+    monkeypatch.setattr(scheduler_module, "_claim_publish", claim)
+
+    assert _publish(post).get() is False
+
+    db.expire_all()
+    assert calls == []
+    # The first attempt plus publish_post's max_retries retries
+    assert len(claims) == scheduler_module.publish_post.max_retries + 1
+    assert db.get(Post, post.id).status == PostStatus.FAILED
+
+def test_dispatch_picks_up_rows_with_default_status(db, monkeypatch):
+    post = Post(content="default status")
+    db.add(post)
+    db.commit()
+    db.add(ScheduledPost(post_id=post.id, scheduled_time=datetime.utcnow() - timedelta(minutes=1)))
+    db.commit()
+    monkeypatch.setattr(scheduler_module.publish_post, "apply_async", lambda args, task_id: None)
+
+    assert scheduler_module.dispatch_due_posts() == 1